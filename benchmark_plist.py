@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+
+# Benchmark generate_plist.py over synthetic catalogs: generation time, peak RSS,
+# bytes on disk and plistlib decode time for each output layout and format
+#
+# Budgets file (--budgets) maps a mode name, or "*" for every mode, to limits on
+# any of budget_fields, e.g.
+#     {"*": {"generate_seconds": 30}, "sharded-binary": {"switch_bytes": 200000}}
+# The file is checked before anything runs. Any result over its budget is
+# reported and the script exits with status 1.
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import plistlib
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+import generate_plist
+
+# Output layouts compared by the benchmark: mode name -> (layout, plist format)
+modes = {
+    'monolithic-xml': ('monolithic', 'xml'),
+    'monolithic-binary': ('monolithic', 'binary'),
+    'sharded-xml': ('sharded', 'xml'),
+    'sharded-binary': ('sharded', 'binary'),
+    'compact-xml': ('compact', 'xml'),
+    'compact-binary': ('compact', 'binary'),
+}
+
+# File prefix of the per-language plist the app decodes on a language switch, per layout
+switch_prefixes = {'sharded': 'SoundboardCategories.', 'compact': 'CompactResources.'}
+
+# Measured result fields a budget can limit
+budget_fields = ('generate_seconds', 'peak_rss_bytes', 'worker_peak_rss_bytes', 'total_bytes', 'monolithic_bytes', 'switch_bytes',
+                 'switch_decode_seconds', 'mean_shard_decode_seconds')
+
+# Catalog sizes to synthesize: every combination of the listed counts is run
+presets = {
+    'smoke': {'languages': [28], 'categories': [5, 50], 'phrases': [10, 100]},
+    'full': {'languages': [28], 'categories': [5, 50, 200], 'phrases': [10, 100, 1000, 10000]},
+}
+
+def load_word_pools(catalog_dir=generate_plist.default_catalog_dir):
+    """Collect words per language from the real catalog so synthetic phrases use each language's script"""
+    with open(os.path.join(catalog_dir, 'categories.json'), encoding='utf-8') as f:
+        category_names = json.load(f)
+    pools = {code: [] for code in generate_plist.languages}
+    for names in category_names.values():
+        for code, name in names.items():
+            pools.setdefault(code, []).extend(name.split())
+    return pools
+
+def synthesize_catalog(catalog_dir, n_languages, n_categories, n_phrases, seed=0):
+    """Write a catalog in generate_plist.py's layout with the given number of languages, categories and phrases
+
+    Call request options and UI strings are copied from the real catalog.
+    """
+    rng = random.Random(seed)
+    pools = load_word_pools()
+    lang_codes = list(generate_plist.languages)[:n_languages]
+    category_ids = [f'category{i:03d}' for i in range(n_categories)]
+
+    os.makedirs(catalog_dir, exist_ok=True)
+    shutil.copy(os.path.join(generate_plist.default_catalog_dir, 'call_requests.json'), catalog_dir)
+    shutil.copytree(os.path.join(generate_plist.default_catalog_dir, 'strings'), os.path.join(catalog_dir, 'strings'))
+    with open(os.path.join(catalog_dir, 'categories.json'), 'w', encoding='utf-8') as f:
+        json.dump({
+            category_id: {code: f'{rng.choice(pools[code])} {i}' for code in lang_codes}
+            for i, category_id in enumerate(category_ids)
+        }, f, ensure_ascii=False)
+
+    for code in lang_codes:
+        lang_dir = os.path.join(catalog_dir, 'phrases', code)
+        os.makedirs(lang_dir, exist_ok=True)
+        for category_id in category_ids:
+            with open(os.path.join(lang_dir, f'{category_id}.txt'), 'w', encoding='utf-8') as f:
+                for i in range(n_phrases):
+                    words = [rng.choice(pools[code]) for _ in range(rng.randint(2, 6))]
+                    f.write(f"{' '.join(words)} {i}\n")
+
+def max_rss_bytes(who):
+    """Return getrusage(who).ru_maxrss in bytes"""
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def peak_rss_bytes():
+    """Return this process's peak resident set size in bytes"""
+    # On Linux ru_maxrss survives fork and exec, so a child would report the
+    # benchmark's own peak; VmHWM belongs to the process image and starts fresh
+    try:
+        with open('/proc/self/status', encoding='ascii') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return max_rss_bytes(resource.RUSAGE_SELF)
+
+def generation_worker(kwargs, queue):
+    """Run the generator in a fresh process so its peak RSS is its own
+
+    With --jobs the writing happens in the generator's process pool, whose
+    workers have exited and been reaped by the time the generator returns, so
+    RUSAGE_CHILDREN holds the largest worker's peak. peak_rss_bytes adds that
+    peak once per worker: an upper bound on what the generator and its pool
+    held at the same time.
+    """
+    jobs = kwargs.get('jobs', 1)
+    # Forkserver workers are children of the server rather than of this process,
+    # and would be missing from RUSAGE_CHILDREN
+    if jobs > 1 and multiprocessing.get_start_method() == 'forkserver':
+        multiprocessing.set_start_method('spawn', force=True)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate_plist.generate_plist(**kwargs)
+    result = {'generate_seconds': time.perf_counter() - start, 'peak_rss_bytes': peak_rss_bytes()}
+    if jobs > 1:
+        result['worker_peak_rss_bytes'] = max_rss_bytes(resource.RUSAGE_CHILDREN)
+        result['peak_rss_bytes'] += jobs * result['worker_peak_rss_bytes']
+    queue.put(result)
+
+def run_generation(**kwargs):
+    """Generate in a spawned child process and return its timing and peak RSS"""
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=generation_worker, args=(kwargs, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    if process.exitcode != 0:
+        raise RuntimeError(f'generate_plist failed with exit code {process.exitcode}')
+    return result
+
+def decode_seconds(path, repeat=3):
+    """Return the best plistlib.loads time for a file, excluding the read from disk"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        plistlib.loads(data)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def measure_outputs(output_dir, layout):
+    """Measure what the app would ship and what it decodes on a language switch"""
+    sizes = {}
+    for directory, _, filenames in os.walk(output_dir):
+        for filename in filenames:
+            name = os.path.relpath(os.path.join(directory, filename), output_dir)
+            if name != generate_plist.manifest_name:
+                sizes[name] = os.path.getsize(os.path.join(directory, filename))
+    result = {'total_bytes': sum(sizes.values()), 'monolithic_bytes': sizes['SoundboardCategories.plist']}
+    if layout in switch_prefixes:
+        shards = [name for name in sizes if name.startswith(switch_prefixes[layout]) and name.count('.') == 2]
+        timings = {name: decode_seconds(os.path.join(output_dir, name)) for name in shards}
+        # A language switch loads one shard; report the worst language
+        result['switch_bytes'] = max(sizes[name] for name in shards)
+        result['switch_decode_seconds'] = max(timings.values())
+        result['mean_shard_decode_seconds'] = sum(timings.values()) / len(timings)
+    else:
+        result['switch_bytes'] = result['monolithic_bytes']
+        result['switch_decode_seconds'] = decode_seconds(os.path.join(output_dir, 'SoundboardCategories.plist'))
+    return result
+
+def count_phrases(output_dir, layout):
+    """Count the phrases in the files the app decodes for a layout, across every language"""
+    if layout not in switch_prefixes:
+        with open(os.path.join(output_dir, 'SoundboardCategories.plist'), 'rb') as f:
+            return sum(len(phrases) for category in plistlib.load(f) for phrases in category['phrases'].values())
+    total = 0
+    for name in os.listdir(output_dir):
+        if name.startswith(switch_prefixes[layout]) and name.count('.') == 2:
+            with open(os.path.join(output_dir, name), 'rb') as f:
+                value = plistlib.load(f)
+            if layout == 'compact':
+                total += sum(len(category['phrases']) for category in value['categories'])
+            else:
+                total += sum(len(phrases) for category in value for phrases in category['phrases'].values())
+    return total
+
+def run_benchmark(n_languages, n_categories, n_phrases, mode_names, jobs=1, work_dir=None):
+    """Synthesize one catalog and benchmark every requested mode against it"""
+    results = []
+    with tempfile.TemporaryDirectory(dir=work_dir) as tmp:
+        catalog_dir = os.path.join(tmp, 'catalog')
+        synthesize_catalog(catalog_dir, n_languages, n_categories, n_phrases)
+        for mode in mode_names:
+            layout, fmt = modes[mode]
+            output_dir = os.path.join(tmp, mode)
+            result = {'mode': mode, 'languages': n_languages, 'categories': n_categories, 'phrases': n_phrases}
+            result.update(run_generation(catalog_dir=catalog_dir, output_dir=output_dir,
+                                         sharded=layout == 'sharded', compact=layout == 'compact',
+                                         formats=generate_plist.parse_formats([fmt]), force=True, jobs=jobs))
+            # A layout that drops phrases would decode faster; refuse to report it
+            expected = n_languages * n_categories * n_phrases
+            found = count_phrases(output_dir, layout)
+            if found != expected:
+                raise RuntimeError(f'{mode} output holds {found} phrases, expected {expected}')
+            result.update(measure_outputs(output_dir, layout))
+            results.append(result)
+            print(f"{mode:18} {n_languages:3} langs {n_categories:4} categories {n_phrases:6} phrases: "
+                  f"{result['generate_seconds']:.2f}s, {result['peak_rss_bytes'] / 2**20:.0f} MiB RSS, "
+                  f"{result['total_bytes']:,} bytes, switch {result['switch_decode_seconds'] * 1000:.2f} ms")
+    return results
+
+def validate_budgets(budgets):
+    """Raise ValueError unless every budget names a known mode or "*" and limits known fields by a number"""
+    if not isinstance(budgets, dict):
+        raise ValueError('Budgets must map a mode or "*" to limits')
+    for mode, limits in budgets.items():
+        if mode != '*' and mode not in modes:
+            raise ValueError(f"Unknown budget mode '{mode}', expected \"*\" or one of: {', '.join(modes)}")
+        if not isinstance(limits, dict):
+            raise ValueError(f"Budget for '{mode}' must map result fields to limits")
+        for field, limit in limits.items():
+            if field not in budget_fields:
+                raise ValueError(f"Unknown budget field '{field}', expected one of: {', '.join(budget_fields)}")
+            if isinstance(limit, bool) or not isinstance(limit, (int, float)):
+                raise ValueError(f"Budget for '{mode}' {field} must be a number")
+
+def check_budgets(results, budgets):
+    """Return a message for every result field that exceeds its budget"""
+    violations = []
+    for result in results:
+        limits = dict(budgets.get('*', {}))
+        limits.update(budgets.get(result['mode'], {}))
+        for field, limit in limits.items():
+            # Some fields, such as mean_shard_decode_seconds, only apply to some modes
+            if field in result and result[field] > limit:
+                violations.append(
+                    f"{result['mode']} ({result['languages']} langs, {result['categories']} categories, "
+                    f"{result['phrases']} phrases): {field} {result[field]} exceeds budget {limit}")
+    return violations
+
+def parse_counts(value):
+    """Parse a comma-separated list of positive counts"""
+    counts = [int(count) for count in value.split(',') if count.strip()]
+    if not counts or min(counts) < 1:
+        raise argparse.ArgumentTypeError('expected a comma-separated list of positive integers')
+    return counts
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark soundboard resource generation')
+    parser.add_argument('--preset', choices=presets, default='smoke',
+                        help='catalog sizes to run (default: smoke)')
+    parser.add_argument('--languages', type=parse_counts, metavar='COUNTS',
+                        help=f'comma-separated language counts, up to {len(generate_plist.languages)}')
+    parser.add_argument('--categories', type=parse_counts, metavar='COUNTS',
+                        help='comma-separated category counts')
+    parser.add_argument('--phrases', type=parse_counts, metavar='COUNTS',
+                        help='comma-separated phrase counts per category and language')
+    parser.add_argument('--modes', default=','.join(modes), metavar='MODES',
+                        help=f"comma-separated output modes (default: {','.join(modes)})")
+    parser.add_argument('--jobs', type=int, default=1, metavar='N',
+                        help='passed to the generator as --jobs')
+    parser.add_argument('--work-dir', help='directory for the synthetic catalogs (default: system temp)')
+    parser.add_argument('--output', metavar='PATH', help='write the results as JSON to PATH')
+    parser.add_argument('--budgets', metavar='PATH', help='JSON budgets to enforce, see the top of this file')
+    args = parser.parse_args()
+
+    mode_names = [mode.strip() for mode in args.modes.split(',') if mode.strip()]
+    unknown = [mode for mode in mode_names if mode not in modes]
+    if unknown:
+        parser.error(f"Unknown modes: {', '.join(unknown)}")
+    sizes = dict(presets[args.preset])
+    for key in ('languages', 'categories', 'phrases'):
+        if getattr(args, key):
+            sizes[key] = getattr(args, key)
+    if max(sizes['languages']) > len(generate_plist.languages):
+        parser.error(f'at most {len(generate_plist.languages)} languages are supported')
+
+    budgets = None
+    if args.budgets:
+        with open(args.budgets, encoding='utf-8') as f:
+            budgets = json.load(f)
+        try:
+            validate_budgets(budgets)
+        except ValueError as e:
+            parser.error(str(e))
+
+    results = []
+    for n_languages in sizes['languages']:
+        for n_categories in sizes['categories']:
+            for n_phrases in sizes['phrases']:
+                results.extend(run_benchmark(n_languages, n_categories, n_phrases, mode_names,
+                                             jobs=args.jobs, work_dir=args.work_dir))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'results': results,
+            }, f, indent=2)
+            f.write('\n')
+
+    if budgets is not None:
+        violations = check_budgets(results, budgets)
+        for violation in violations:
+            print(f'Budget exceeded: {violation}')
+        if violations:
+            sys.exit(1)
@@ -1,19 +1,48 @@
 #!/usr/bin/env python3
 
-# Script to generate comprehensive SoundboardCategories.plist
+# Script to generate SoundboardCategories.plist, CallRequestOptions.plist and the
+# per-language Localizable.strings tables from the phrase catalog in a single pass
 
-plist_header = '''<?xml version="1.0" encoding="UTF-8"?>
-<!DOCTYPE plist PUBLIC "-//Apple//DTD PLIST 1.0//EN" "http://www.apple.com/DTDs/PropertyList-1.0.dtd">
-<plist version="1.0">
-<array>'''
+import argparse
+import concurrent.futures
+import contextlib
+import hashlib
+import json
+import os
+import plistlib
+import re
+import unicodedata
 
-plist_footer = '''
-</array>
-</plist>'''
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Default locations, relative to this script so the generator runs on any machine
+default_catalog_dir = os.path.join(script_dir, 'catalog')
+default_output_dir = os.path.join(script_dir, 'Resources')
+
+# Index describing the per-language shards written by --sharded, --compact and --search-index
+shard_index_name = 'ResourceIndex.plist'
+
+# Build manifest kept next to the outputs, recording the inputs each one was generated from
+manifest_name = '.generate_plist.manifest.json'
+
+# Bump when the layout of generated files changes so cached outputs are rebuilt
+cache_version = 4
+
+# Artifacts whose output format can be chosen with --format
+artifacts = ('SoundboardCategories', 'CallRequestOptions', 'CompactResources', 'SearchIndex', 'ResourceIndex')
+
+# Compiled .strings tables are always binary plists, as Xcode would produce them
+localizable_format = 'binary'
+
+# Supported plist output formats; PropertyListDecoder reads either
+plist_formats = {'xml': plistlib.FMT_XML, 'binary': plistlib.FMT_BINARY}
+
+# Control characters XML plists cannot hold; tab, line feed and carriage return are allowed
+plist_control_chars = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
 
 # Language codes and their display names
 languages = {
-    'en': 'English', 'es': 'Spanish', 'fr': 'French', 'de': 'German', 'pt': 'Portuguese', 
+    'en': 'English', 'es': 'Spanish', 'fr': 'French', 'de': 'German', 'pt': 'Portuguese',
     'it': 'Italian', 'ja': 'Japanese', 'nl': 'Dutch', 'ru': 'Russian', 'zh': 'Chinese',
     'hi': 'Hindi', 'ar': 'Arabic', 'bn': 'Bengali', 'ko': 'Korean', 'tr': 'Turkish',
     'pl': 'Polish', 'sv': 'Swedish', 'vi': 'Vietnamese', 'id': 'Indonesian', 'ur': 'Urdu',
@@ -21,236 +50,701 @@ languages = {
     'ro': 'Romanian', 'da': 'Danish', 'fi': 'Finnish'
 }
 
-# Category display names in all languages
-category_names = {
-    'greetings': {
-        'en': 'Greetings', 'es': 'Saludos', 'fr': 'Salutations', 'de': 'Grüße', 'pt': 'Saudações',
-        'it': 'Saluti', 'ja': '挨拶', 'nl': 'Begroetingen', 'ru': 'Приветствия', 'zh': '问候',
-        'hi': 'अभिवादन', 'ar': 'التحيات', 'bn': 'শুভেচ্ছা', 'ko': '인사', 'tr': 'Selamlar',
-        'pl': 'Pozdrowienia', 'sv': 'Hälsningar', 'vi': 'Lời chào', 'id': 'Salam', 'ur': 'سلام',
-        'tl': 'Pagbati', 'th': 'การทักทาย', 'el': 'Χαιρετισμοί', 'cs': 'Pozdravy', 'hu': 'Üdvözlések',
-        'ro': 'Salutări', 'da': 'Hilsner', 'fi': 'Tervehdykset'
-    },
-    'needs': {
-        'en': 'Needs', 'es': 'Necesidades', 'fr': 'Besoins', 'de': 'Bedürfnisse', 'pt': 'Necessidades',
-        'it': 'Bisogni', 'ja': '必要', 'nl': 'Behoeften', 'ru': 'Потребности', 'zh': '需要',
-        'hi': 'आवश्यकताएं', 'ar': 'الاحتياجات', 'bn': 'প্রয়োজন', 'ko': '필요', 'tr': 'İhtiyaçlar',
-        'pl': 'Potrzeby', 'sv': 'Behov', 'vi': 'Nhu cầu', 'id': 'Kebutuhan', 'ur': 'ضروریات',
-        'tl': 'Pangangailangan', 'th': 'ความต้องการ', 'el': 'Ανάγκες', 'cs': 'Potřeby', 'hu': 'Szükségletek',
-        'ro': 'Nevoi', 'da': 'Behov', 'fi': 'Tarpeet'
-    },
-    'comfort': {
-        'en': 'Comfort', 'es': 'Comodidad', 'fr': 'Confort', 'de': 'Komfort', 'pt': 'Conforto',
-        'it': 'Comfort', 'ja': '快適', 'nl': 'Comfort', 'ru': 'Комфорт', 'zh': '舒适',
-        'hi': 'आराम', 'ar': 'الراحة', 'bn': 'আরাম', 'ko': '편안함', 'tr': 'Konfor',
-        'pl': 'Komfort', 'sv': 'Komfort', 'vi': 'Thoải mái', 'id': 'Kenyamanan', 'ur': 'آرام',
-        'tl': 'Ginhawa', 'th': 'ความสะดวกสบาย', 'el': 'Άνεση', 'cs': 'Pohodlí', 'hu': 'Kényelem',
-        'ro': 'Confort', 'da': 'Komfort', 'fi': 'Mukavuus'
-    },
-    'feelings': {
-        'en': 'Feelings', 'es': 'Sentimientos', 'fr': 'Sentiments', 'de': 'Gefühle', 'pt': 'Sentimentos',
-        'it': 'Sentimenti', 'ja': '感情', 'nl': 'Gevoelens', 'ru': 'Чувства', 'zh': '感受',
-        'hi': 'भावनाएं', 'ar': 'المشاعر', 'bn': 'অনুভূতি', 'ko': '감정', 'tr': 'Duygular',
-        'pl': 'Uczucia', 'sv': 'Känslor', 'vi': 'Cảm xúc', 'id': 'Perasaan', 'ur': 'احساسات',
-        'tl': 'Damdamin', 'th': 'ความรู้สึก', 'el': 'Συναισθήματα', 'cs': 'Pocity', 'hu': 'Érzések',
-        'ro': 'Sentimente', 'da': 'Følelser', 'fi': 'Tunteet'
-    },
-    'responses': {
-        'en': 'Responses', 'es': 'Respuestas', 'fr': 'Réponses', 'de': 'Antworten', 'pt': 'Respostas',
-        'it': 'Risposte', 'ja': '返答', 'nl': 'Antwoorden', 'ru': 'Ответы', 'zh': '回应',
-        'hi': 'उत्तर', 'ar': 'الردود', 'bn': 'প্রতিক্রিয়া', 'ko': '응답', 'tr': 'Cevaplar',
-        'pl': 'Odpowiedzi', 'sv': 'Svar', 'vi': 'Phản hồi', 'id': 'Tanggapan', 'ur': 'جوابات',
-        'tl': 'Mga tugon', 'th': 'การตอบสนอง', 'el': 'Απαντήσεις', 'cs': 'Odpovědi', 'hu': 'Válaszok',
-        'ro': 'Răspunsuri', 'da': 'Svar', 'fi': 'Vastaukset'
-    }
-}
+# Search index gram length: CJK characters carry a syllable or word each, so two are selective enough
+search_gram_sizes = {'zh': 2, 'ja': 2, 'ko': 2}
+default_search_gram_size = 3
+
+# Languages written without spaces between words, where a match may start at any character
+unsegmented_languages = {'zh', 'ja', 'th'}
+
+# Letters with no Unicode decomposition that search still treats as their plain form
+search_letter_folds = {'đ': 'd', 'ł': 'l', 'ø': 'o', 'æ': 'ae', 'œ': 'oe', 'ı': 'i', 'ħ': 'h'}
 
 def generate_category_dict(category_id, category_names, phrases_dict):
     """Generate a category dictionary with all language support"""
-    result = f'''
-    <dict>
-        <key>id</key><string>{category_id}</string>
-        <key>displayNames</key>
-        <dict>'''
-    
-    # Add all language display names
-    for lang_code, name in category_names.items():
-        result += f'''
-            <key>{lang_code}</key><string>{name}</string>'''
-    
-    result += '''
-        </dict>
-        <key>phrases</key>
-        <dict>'''
-    
-    # Add phrases for each language
-    for lang_code, phrases in phrases_dict.items():
-        result += f'''
-            <key>{lang_code}</key><array>'''
-        for phrase in phrases:
-            result += f'''
-                <string>{phrase}</string>'''
-        result += '''
-            </array>'''
-    
-    result += '''
-        </dict>
-    </dict>'''
-    
-    return result
-
-# Generate comprehensive plist with all web version data
-def generate_plist():
-    with open('/Users/shanestone/Documents/CallBell-app/iControlBell-new/Resources/SoundboardCategories.plist', 'w') as f:
-        f.write(plist_header)
-        f.write('''
-    <dict>
-        <key>id</key><string>greetings</string>
-        <key>displayNames</key>
-        <dict>
-            <key>en</key><string>Greetings</string>
-            <key>es</key><string>Saludos</string>
-            <key>fr</key><string>Salutations</string>
-            <key>de</key><string>Grüße</string>
-            <key>pt</key><string>Saudações</string>
-        </dict>
-        <key>phrases</key>
-        <dict>
-            <key>en</key><array>
-                <string>Hello</string><string>Goodbye</string><string>Thank you</string><string>Please</string><string>How are you?</string><string>My name is...</string><string>Good morning</string><string>Good afternoon</string><string>Good evening</string><string>Good night</string><string>You're welcome</string><string>Excuse me</string><string>I'm sorry</string><string>Nice to meet you</string><string>See you later</string><string>What is your name?</string><string>Thank you for your help</string><string>I appreciate it</string><string>Have a good day</string><string>You too</string><string>Yes, please</string><string>No, thank you</string>
-            </array>
-            <key>es</key><array>
-                <string>Hola</string><string>Adiós</string><string>Gracias</string><string>Por favor</string><string>¿Cómo está?</string><string>Mi nombre es...</string><string>Buenos días</string><string>Buenas tardes</string><string>Buenas noches</string><string>Que descanse</string><string>De nada</string><string>Perdón</string><string>Lo siento</string><string>Encantado de conocerle</string><string>Hasta luego</string><string>¿Cómo se llama?</string><string>Gracias por su ayuda</string><string>Se lo agradezco</string><string>Que tenga un buen día</string><string>Igualmente</string><string>Sí, por favor</string><string>No, gracias</string>
-            </array>
-            <key>fr</key><array>
-                <string>Bonjour</string><string>Au revoir</string><string>Merci</string><string>S'il vous plaît</string><string>Comment allez-vous ?</string><string>Je m'appelle...</string><string>Bonjour</string><string>Bon après-midi</string><string>Bonsoir</string><string>Bonne nuit</string><string>De rien</string><string>Excusez-moi</string><string>Je suis désolé(e)</string><string>Enchanté(e)</string><string>À plus tard</string><string>Comment vous appelez-vous ?</string><string>Merci pour votre aide</string><string>J'apprécie</string><string>Bonne journée</string><string>Vous aussi</string><string>Oui, s'il vous plaît</string><string>Non, merci</string>
-            </array>
-            <key>de</key><array>
-                <string>Hallo</string><string>Auf Wiedersehen</string><string>Danke</string><string>Bitte</string><string>Wie geht es Ihnen?</string><string>Mein Name ist...</string><string>Guten Morgen</string><string>Guten Tag</string><string>Guten Abend</string><string>Gute Nacht</string><string>Gern geschehen</string><string>Entschuldigung</string><string>Es tut mir leid</string><string>Schön, Sie kennenzulernen</string><string>Bis später</string><string>Wie heißen Sie?</string><string>Danke für Ihre Hilfe</string><string>Ich weiß das zu schätzen</string><string>Schönen Tag noch</string><string>Ihnen auch</string><string>Ja, bitte</string><string>Nein, danke</string>
-            </array>
-            <key>pt</key><array>
-                <string>Olá</string><string>Adeus</string><string>Obrigado(a)</string><string>Por favor</string><string>Como está?</string><string>O meu nome é...</string><string>Bom dia</string><string>Boa tarde</string><string>Boa noite</string><string>Boa noite</string><string>De nada</string><string>Com licença</string><string>Desculpe</string><string>Prazer em conhecê-lo(a)</string><string>Até logo</string><string>Qual é o seu nome?</string><string>Obrigado(a) pela sua ajuda</string><string>Eu agradeço</string><string>Tenha um bom dia</string><string>Igualmente</string><string>Sim, por favor</string><string>Não, obrigado(a)</string>
-            </array>
-        </dict>
-    </dict>
-    <dict>
-        <key>id</key><string>needs</string>
-        <key>displayNames</key>
-        <dict>
-            <key>en</key><string>Needs</string>
-            <key>es</key><string>Necesidades</string>
-            <key>fr</key><string>Besoins</string>
-            <key>de</key><string>Bedürfnisse</string>
-            <key>pt</key><string>Necessidades</string>
-        </dict>
-        <key>phrases</key>
-        <dict>
-            <key>en</key><array>
-                <string>I'm thirsty</string><string>I'm hungry</string><string>I need to use the restroom</string><string>I need to wash up</string><string>Can I have some water?</string><string>Can I have something to eat?</string><string>I need help getting to the toilet</string><string>I need a bedpan</string><string>I need help brushing my teeth</string><string>Can you help me wash my face?</string><string>I dropped something</string><string>Can you pass me my phone?</string><string>Can you pass me my glasses?</string><string>Can you pass me the remote?</string><string>I need my medication</string><string>I need to take my pills</string><string>Can you open the window?</string><string>Can you close the window?</string><string>Can you open the curtains?</string><string>Can you close the curtains?</string><string>I need a tissue</string>
-            </array>
-            <key>es</key><array>
-                <string>Tengo sed</string><string>Tengo hambre</string><string>Necesito usar el baño</string><string>Necesito lavarme</string><string>¿Me puede dar un poco de agua?</string><string>¿Me puede dar algo de comer?</string><string>Necesito ayuda para ir al baño</string><string>Necesito un orinal</string><string>Necesito ayuda para lavarme los dientes</string><string>¿Me puede ayudar a lavarme la cara?</string><string>Se me ha caído algo</string><string>¿Me puede pasar mi teléfono?</string><string>¿Me puede pasar mis gafas?</string><string>¿Me puede pasar el mando?</string><string>Necesito mi medicación</string><string>Necesito tomar mis pastillas</string><string>¿Puede abrir la ventana?</string><string>¿Puede cerrar la ventana?</string><string>¿Puede abrir las cortinas?</string><string>¿Puede cerrar las cortinas?</string><string>Necesito un pañuelo</string>
-            </array>
-            <key>fr</key><array>
-                <string>J'ai soif</string><string>J'ai faim</string><string>J'ai besoin d'aller aux toilettes</string><string>J'ai besoin de me laver</string><string>Puis-je avoir de l'eau ?</string><string>Puis-je avoir quelque chose à manger ?</string><string>J'ai besoin d'aide pour aller aux toilettes</string><string>J'ai besoin d'un bassin de lit</string><string>J'ai besoin d'aide pour me brosser les dents</string><string>Pouvez-vous m'aider à me laver le visage ?</string><string>J'ai fait tomber quelque chose</string><string>Pouvez-vous me passer mon téléphone ?</string><string>Pouvez-vous me passer mes lunettes ?</string><string>Pouvez-vous me passer la télécommande ?</string><string>J'ai besoin de mes médicaments</string><string>Je dois prendre mes pilules</string><string>Pouvez-vous ouvrir la fenêtre ?</string><string>Pouvez-vous fermer la fenêtre ?</string><string>Pouvez-vous ouvrir les rideaux ?</string><string>Pouvez-vous fermer les rideaux ?</string><string>J'ai besoin d'un mouchoir</string>
-            </array>
-            <key>de</key><array>
-                <string>Ich habe Durst</string><string>Ich habe Hunger</string><string>Ich muss auf die Toilette</string><string>Ich muss mich waschen</string><string>Kann ich etwas Wasser haben?</string><string>Kann ich etwas zu essen haben?</string><string>Ich brauche Hilfe, um zur Toilette zu gelangen</string><string>Ich brauche eine Bettpfanne</string><string>Ich brauche Hilfe beim Zähneputzen</string><string>Können Sie mir helfen, mein Gesicht zu waschen?</string><string>Ich habe etwas fallen lassen</string><string>Können Sie mir mein Telefon geben?</string><string>Können Sie mir meine Brille geben?</string><string>Können Sie mir die Fernbedienung geben?</string><string>Ich brauche meine Medikamente</string><string>Ich muss meine Tabletten nehmen</string><string>Können Sie das Fenster öffnen?</string><string>Können Sie das Fenster schließen?</string><string>Können Sie die Vorhänge öffnen?</string><string>Können Sie die Vorhänge schließen?</string><string>Ich brauche ein Taschentuch</string>
-            </array>
-            <key>pt</key><array>
-                <string>Estou com sede</string><string>Estou com fome</string><string>Preciso de ir à casa de banho</string><string>Preciso de me lavar</string><string>Pode dar-me um pouco de água?</string><string>Pode dar-me algo para comer?</string><string>Preciso de ajuda para ir à casa de banho</string><string>Preciso de uma comadre</string><string>Preciso de ajuda para lavar os dentes</string><string>Pode ajudar-me a lavar o rosto?</string><string>Deixei cair uma coisa</string><string>Pode passar-me o meu telemóvel?</string><string>Pode passar-me os meus óculos?</string><string>Pode passar-me o comando?</string><string>Preciso da minha medicação</string><string>Preciso de tomar os meus comprimidos</string><string>Pode abrir a janela?</string><string>Pode fechar a janela?</string><string>Pode abrir as cortinas?</string><string>Pode fechar as cortinas?</string><string>Preciso de um lenço de papel</string>
-            </array>
-        </dict>
-    </dict>
-    <dict>
-        <key>id</key><string>comfort</string>
-        <key>displayNames</key>
-        <dict>
-            <key>en</key><string>Comfort</string>
-            <key>es</key><string>Comodidad</string>
-            <key>fr</key><string>Confort</string>
-            <key>de</key><string>Komfort</string>
-            <key>pt</key><string>Conforto</string>
-        </dict>
-        <key>phrases</key>
-        <dict>
-            <key>en</key><array>
-                <string>I'm uncomfortable</string><string>Can you adjust my pillow?</string><string>Can you raise the bed?</string><string>Can you lower the bed?</string><string>I'm cold</string><string>I'm hot</string><string>I need another blanket</string><string>Can you remove a blanket?</string><string>The room is too bright</string><string>The room is too dark</string><string>It's too noisy here</string><string>Can you turn on the light?</string><string>Can you turn off the light?</string><string>Can you turn on the TV?</string><string>Can you turn off the TV?</string><string>Can you change the channel?</string><string>Can you lower the volume?</string><string>Can you increase the volume?</string><string>I need to sit up</string><string>I need to lie down</string><string>My body is sore</string><string>I need to stretch my legs</string><string>Can you help me change position?</string>
-            </array>
-            <key>es</key><array>
-                <string>Estoy incómodo/a</string><string>¿Puede ajustar mi almohada?</string><string>¿Puede subir la cama?</string><string>¿Puede bajar la cama?</string><string>Tengo frío</string><string>Tengo calor</string><string>Necesito otra manta</string><string>¿Puede quitar una manta?</string><string>La habitación está muy iluminada</string><string>La habitación está muy oscura</string><string>Aquí hay mucho ruido</string><string>¿Puede encender la luz?</string><string>¿Puede apagar la luz?</string><string>¿Puede encender la televisión?</string><string>¿Puede apagar la televisión?</string><string>¿Puede cambiar el canal?</string><string>¿Puede bajar el volumen?</string><string>¿Puede subir el volumen?</string><string>Necesito sentarme</string><string>Necesito acostarme</string><string>Me duele el cuerpo</string><string>Necesito estirar las piernas</string><string>¿Me puede ayudar a cambiar de posición?</string>
-            </array>
-            <key>fr</key><array>
-                <string>Je suis inconfortable</string><string>Pouvez-vous ajuster mon oreiller ?</string><string>Pouvez-vous monter le lit ?</string><string>Pouvez-vous baisser le lit ?</string><string>J'ai froid</string><string>J'ai chaud</string><string>J'ai besoin d'une autre couverture</string><string>Pouvez-vous enlever une couverture ?</string><string>La pièce est trop lumineuse</string><string>La pièce est trop sombre</string><string>C'est trop bruyant ici</string><string>Pouvez-vous allumer la lumière ?</string><string>Pouvez-vous éteindre la lumière ?</string><string>Pouvez-vous allumer la télé ?</string><string>Pouvez-vous éteindre la télé ?</string><string>Pouvez-vous changer de chaîne ?</string><string>Pouvez-vous baisser le volume ?</string><string>Pouvez-vous augmenter le volume ?</string><string>J'ai besoin de m'asseoir</string><string>J'ai besoin de m'allonger</string><string>J'ai mal partout</string><string>J'ai besoin d'étirer mes jambes</string><string>Pouvez-vous m'aider à changer de position ?</string>
-            </array>
-            <key>de</key><array>
-                <string>Mir ist unwohl</string><string>Können Sie mein Kissen richten?</string><string>Können Sie das Bett hochstellen?</string><string>Können Sie das Bett runterstellen?</string><string>Mir ist kalt</string><string>Mir ist heiß</string><string>Ich brauche noch eine Decke</string><string>Können Sie eine Decke wegnehmen?</string><string>Das Zimmer ist zu hell</string><string>Das Zimmer ist zu dunkel</string><string>Es ist zu laut hier</string><string>Können Sie das Licht anmachen?</string><string>Können Sie das Licht ausmachen?</string><string>Können Sie den Fernseher anmachen?</string><string>Können Sie den Fernseher ausmachen?</string><string>Können Sie den Kanal wechseln?</string><string>Können Sie die Lautstärke leiser machen?</string><string>Können Sie die Lautstärke lauter machen?</string><string>Ich muss mich aufsetzen</string><string>Ich muss mich hinlegen</string><string>Mein Körper tut weh</string><string>Ich muss meine Beine strecken</string><string>Können Sie mir helfen, meine Position zu ändern?</string>
-            </array>
-            <key>pt</key><array>
-                <string>Estou desconfortável</string><string>Pode ajustar a minha almofada?</string><string>Pode subir a cama?</string><string>Pode descer a cama?</string><string>Estou com frio</string><string>Estou com calor</string><string>Preciso de outro cobertor</string><string>Pode tirar um cobertor?</string><string>O quarto está muito claro</string><string>O quarto está muito escuro</string><string>Está muito barulho aqui</string><string>Pode acender a luz?</string><string>Pode apagar a luz?</string><string>Pode ligar a TV?</string><string>Pode desligar a TV?</string><string>Pode mudar o canal?</string><string>Pode baixar o volume?</string><string>Pode aumentar o volume?</string><string>Preciso de me sentar</string><string>Preciso de me deitar</string><string>O meu corpo está dorido</string><string>Preciso de esticar as pernas</string><string>Pode ajudar-me a mudar de posição?</string>
-            </array>
-        </dict>
-    </dict>
-    <dict>
-        <key>id</key><string>feelings</string>
-        <key>displayNames</key>
-        <dict>
-            <key>en</key><string>Feelings</string>
-            <key>es</key><string>Sentimientos</string>
-            <key>fr</key><string>Sentiments</string>
-            <key>de</key><string>Gefühle</string>
-            <key>pt</key><string>Sentimentos</string>
-        </dict>
-        <key>phrases</key>
-        <dict>
-            <key>en</key><array>
-                <string>I'm in pain</string><string>The pain is sharp</string><string>The pain is dull and aching</string><string>The pain is constant</string><string>The pain comes and goes</string><string>My pain is getting worse</string><string>My pain is a little better</string><string>I feel dizzy</string><string>I feel nauseous</string><string>I feel like I'm going to throw up</string><string>I'm tired</string><string>I'm very sleepy</string><string>I feel weak</string><string>I feel anxious</string><string>I feel scared</string><string>I feel confused</string><string>I feel lonely</string><string>I'm happy today</string><string>I'm feeling sad</string><string>I'm having trouble breathing</string><string>I feel short of breath</string><string>My head hurts</string><string>My stomach hurts</string><string>I feel itchy</string><string>I want to talk to someone</string>
-            </array>
-            <key>es</key><array>
-                <string>Tengo dolor</string><string>El dolor es agudo</string><string>El dolor es sordo y persistente</string><string>El dolor es constante</string><string>El dolor va y viene</string><string>Mi dolor está empeorando</string><string>Mi dolor ha mejorado un poco</string><string>Me siento mareado/a</string><string>Tengo náuseas</string><string>Siento que voy a vomitar</string><string>Estoy cansado/a</string><string>Tengo mucho sueño</string><string>Me siento débil</string><string>Me siento ansioso/a</string><string>Tengo miedo</string><string>Me siento confundido/a</string><string>Me siento solo/a</string><string>Hoy estoy feliz</string><string>Me siento triste</string><string>Tengo problemas para respirar</string><string>Me falta el aliento</string><string>Me duele la cabeza</string><string>Me duele el estómago</string><string>Me pica</string><string>Quiero hablar con alguien</string>
-            </array>
-            <key>fr</key><array>
-                <string>J'ai mal</string><string>La douleur est aiguë</string><string>La douleur est sourde et lancinante</string><string>La douleur est constante</string><string>La douleur va et vient</string><string>Ma douleur s'aggrave</string><string>Ma douleur va un peu mieux</string><string>J'ai des vertiges</string><string>J'ai la nausée</string><string>J'ai l'impression que je vais vomir</string><string>Je suis fatigué(e)</string><string>J'ai très sommeil</string><string>Je me sens faible</string><string>Je me sens anxieux/anxieuse</string><string>J'ai peur</string><string>Je me sens confus(e)</string><string>Je me sens seul(e)</string><string>Je suis heureux/heureuse aujourd'hui</string><string>Je me sens triste</string><string>J'ai du mal à respirer</string><string>Je suis essoufflé(e)</string><string>J'ai mal à la tête</string><string>J'ai mal à l'estomac</string><string>Ça me démange</string><string>Je veux parler à quelqu'un</string>
-            </array>
-            <key>de</key><array>
-                <string>Ich habe Schmerzen</string><string>Der Schmerz ist stechend</string><string>Der Schmerz ist dumpf und schmerzend</string><string>Der Schmerz ist konstant</string><string>Der Schmerz kommt und geht</string><string>Meine Schmerzen werden schlimmer</string><string>Meine Schmerzen sind etwas besser</string><string>Mir ist schwindelig</string><string>Mir ist übel</string><string>Mir ist, als müsste ich mich übergeben</string><string>Ich bin müde</string><string>Ich bin sehr schläfrig</string><string>Ich fühle mich schwach</string><string>Ich fühle mich ängstlich</string><string>Ich habe Angst</string><string>Ich bin verwirrt</string><string>Ich fühle mich einsam</string><string>Ich bin heute glücklich</string><string>Ich bin traurig</string><string>Ich habe Atembeschwerden</string><string>Ich bin kurzatmig</string><string>Mein Kopf tut weh</string><string>Mein Magen tut weh</string><string>Es juckt mich</string><string>Ich möchte mit jemandem sprechen</string>
-            </array>
-            <key>pt</key><array>
-                <string>Estou com dor</string><string>A dor é aguda</string><string>A dor é surda e latejante</string><string>A dor é constante</string><string>A dor vai e vem</string><string>A minha dor está a piorar</string><string>A minha dor está um pouco melhor</string><string>Estou tonto/a</string><string>Estou com náuseas</string><string>Sinto que vou vomitar</string><string>Estou cansado/a</string><string>Estou com muito sono</string><string>Sinto-me fraco/a</string><string>Sinto-me ansioso/a</string><string>Estou com medo</string><string>Sinto-me confuso/a</string><string>Sinto-me sozinho/a</string><string>Hoje estou feliz</string><string>Estou triste</string><string>Tenho dificuldade em respirar</string><string>Sinto falta de ar</string><string>Dói-me a cabeça</string><string>Dói-me o estômago</string><string>Sinto comichão</string><string>Quero falar com alguém</string>
-            </array>
-        </dict>
-    </dict>
-    <dict>
-        <key>id</key><string>responses</string>
-        <key>displayNames</key>
-        <dict>
-            <key>en</key><string>Responses</string>
-            <key>es</key><string>Respuestas</string>
-            <key>fr</key><string>Réponses</string>
-            <key>de</key><string>Antworten</string>
-            <key>pt</key><string>Respostas</string>
-        </dict>
-        <key>phrases</key>
-        <dict>
-            <key>en</key><array>
-                <string>Yes</string><string>No</string><string>Okay</string><string>I don't know</string><string>Please wait</string><string>Yes, please</string><string>No, thank you</string><string>I understand</string><string>I don't understand</string><string>Can you repeat that?</string><string>Can you speak slower?</string><string>Can you write it down?</string><string>That's correct</string><string>That's incorrect</string><string>I agree</string><string>I don't agree</string><string>I need a moment to think</string><string>I'm ready</string><string>I'm not ready</string><string>A little bit</string><string>A lot</string><string>Thank you, that's enough</string>
-            </array>
-            <key>es</key><array>
-                <string>Sí</string><string>No</string><string>De acuerdo</string><string>No sé</string><string>Por favor, espere</string><string>Sí, por favor</string><string>No, gracias</string><string>Entiendo</string><string>No entiendo</string><string>¿Puede repetir eso?</string><string>¿Puede hablar más despacio?</string><string>¿Puede escribirlo?</string><string>Eso es correcto</string><string>Eso es incorrecto</string><string>Estoy de acuerdo</string><string>No estoy de acuerdo</string><string>Necesito un momento para pensar</string><string>Estoy listo/a</string><string>No estoy listo/a</string><string>Un poco</string><string>Mucho</string><string>Gracias, es suficiente</string>
-            </array>
-            <key>fr</key><array>
-                <string>Oui</string><string>Non</string><string>D'accord</string><string>Je ne sais pas</string><string>Veuillez patienter</string><string>Oui, s'il vous plaît</string><string>Non, merci</string><string>Je comprends</string><string>Je ne comprends pas</string><string>Pouvez-vous répéter cela ?</string><string>Pouvez-vous parler plus lentement ?</string><string>Pouvez-vous l'écrire ?</string><string>C'est correct</string><string>C'est incorrect</string><string>Je suis d'accord</string><string>Je ne suis pas d'accord</string><string>J'ai besoin d'un moment pour réfléchir</string><string>Je suis prêt(e)</string><string>Je ne suis pas prêt(e)</string><string>Un petit peu</string><string>Beaucoup</string><string>Merci, ça suffit</string>
-            </array>
-            <key>de</key><array>
-                <string>Ja</string><string>Nein</string><string>Okay</string><string>Ich weiß nicht</string><string>Bitte warten Sie</string><string>Ja, bitte</string><string>Nein, danke</string><string>Ich verstehe</string><string>Ich verstehe nicht</string><string>Können Sie das wiederholen?</string><string>Können Sie langsamer sprechen?</string><string>Können Sie es aufschreiben?</string><string>Das ist richtig</string><string>Das ist falsch</string><string>Ich stimme zu</string><string>Ich stimme nicht zu</string><string>Ich brauche einen Moment zum Nachdenken</string><string>Ich bin bereit</string><string>Ich bin nicht bereit</string><string>Ein bisschen</string><string>Viel</string><string>Danke, das ist genug</string>
-            </array>
-            <key>pt</key><array>
-                <string>Sim</string><string>Não</string><string>Ok</string><string>Não sei</string><string>Por favor, espere</string><string>Sim, por favor</string><string>Não, obrigado(a)</string><string>Eu entendo</string><string>Eu não entendo</string><string>Pode repetir isso?</string><string>Pode falar mais devagar?</string><string>Pode escrever?</string><string>Isso está correto</string><string>Isso está incorreto</string><string>Eu concordo</string><string>Eu não concordo</string><string>Preciso de um momento para pensar</string><string>Estou pronto/a</string><string>Não estou pronto/a</string><string>Um pouco</string><string>Muito</string><string>Obrigado(a), é o suficiente</string>
-            </array>
-        </dict>
-    </dict>''')
-        f.write(plist_footer)
-        print("Comprehensive plist file generated successfully!")
+    return {
+        'id': category_id,
+        'displayNames': dict(category_names),
+        'phrases': {lang_code: list(phrases) for lang_code, phrases in phrases_dict.items()},
+    }
+
+class Catalog:
+    """Source catalog for every generated resource
+
+    categories.json lists the category ids in display order with their
+    display names per language. Each phrases/<lang>/<category>.txt holds one
+    phrase per line and is only read while the outputs that need it are being
+    digested or emitted. call_requests.json lists the call request options with their
+    labels, and strings/<lang>.json holds each language's UI strings.
+    """
+
+    def __init__(self, catalog_dir, lang_codes=None, category_ids=None):
+        self.catalog_dir = catalog_dir
+        try:
+            with open(os.path.join(catalog_dir, 'categories.json'), encoding='utf-8') as f:
+                category_names = json.load(f)
+        except FileNotFoundError:
+            raise ValueError(f'No categories.json in catalog directory {catalog_dir}') from None
+
+        unknown = [code for code in lang_codes or [] if code not in languages]
+        if unknown:
+            raise ValueError(f"Unknown language codes: {', '.join(unknown)}")
+        unknown = [category_id for category_id in category_ids or [] if category_id not in category_names]
+        if unknown:
+            raise ValueError(f"Unknown categories: {', '.join(unknown)}")
+
+        self.category_names = {
+            category_id: names for category_id, names in category_names.items()
+            if category_ids is None or category_id in category_ids
+        }
+        try:
+            with open(os.path.join(catalog_dir, 'call_requests.json'), encoding='utf-8') as f:
+                self.call_request_options = json.load(f)
+        except FileNotFoundError:
+            self.call_request_options = []
+
+        present = set()
+        for directory in ('phrases', 'strings'):
+            path = os.path.join(catalog_dir, directory)
+            if os.path.isdir(path):
+                present.update(os.path.splitext(name)[0] for name in os.listdir(path))
+        for names in self.category_names.values():
+            present.update(names)
+        for option in self.call_request_options:
+            present.update(option['labels'])
+        self.languages = [
+            code for code in languages
+            if (lang_codes is None or code in lang_codes) and code in present
+        ]
+
+    @property
+    def category_ids(self):
+        return list(self.category_names)
+
+    def phrases_path(self, lang_code, category_id):
+        return os.path.join(self.catalog_dir, 'phrases', lang_code, f'{category_id}.txt')
+
+    def strings_path(self, lang_code):
+        return os.path.join(self.catalog_dir, 'strings', f'{lang_code}.json')
+
+    def ui_strings(self, lang_code):
+        """Return one language's UI strings, or None if the language has none"""
+        try:
+            with open(self.strings_path(lang_code), encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def iter_phrases(self, lang_code, category_id):
+        """Yield the phrases of one category in one language, a line at a time
+
+        Raises ValueError naming the file and line of a phrase with a control
+        character, which plistlib would reject without saying where it came from.
+        """
+        try:
+            with open(self.phrases_path(lang_code, category_id), encoding='utf-8') as f:
+                for line_number, line in enumerate(f, 1):
+                    phrase = line.rstrip('\r\n')
+                    match = plist_control_chars.search(phrase)
+                    if match:
+                        raise ValueError(f'phrases/{lang_code}/{category_id}.txt line {line_number}: '
+                                         f'control character U+{ord(match.group()):04X} is not allowed in a phrase')
+                    if phrase:
+                        yield phrase
+        except FileNotFoundError:
+            return
+
+    def category(self, category_id, lang_codes):
+        """Build one category dictionary restricted to the given languages"""
+        names = self.category_names[category_id]
+        return generate_category_dict(
+            category_id,
+            {code: names[code] for code in lang_codes if code in names},
+            {
+                code: self.iter_phrases(code, category_id) for code in lang_codes
+                if os.path.exists(self.phrases_path(code, category_id))
+            },
+        )
+
+    def iter_categories(self, lang_codes):
+        """Yield category dictionaries one at a time, restricted to the given languages"""
+        for category_id in self.category_names:
+            yield self.category(category_id, lang_codes)
+
+    def stat_signature(self):
+        """Return (path, size, mtime) for every catalog file the selection reads"""
+        paths = [os.path.join(self.catalog_dir, name) for name in ('categories.json', 'call_requests.json')]
+        paths += [self.strings_path(code) for code in self.languages]
+        paths += [self.phrases_path(code, category_id)
+                  for code in self.languages for category_id in self.category_names]
+        return [stat_signature(path) for path in paths]
+
+@contextlib.contextmanager
+def open_output(path):
+    """Open a temporary file for writing and move it over path once writing succeeds"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            yield f
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def write_plist(path, value, fmt='xml'):
+    """Serialize a plist value straight to disk in the given output format
+
+    plistlib escapes string content and rejects characters plists cannot hold,
+    so bad phrases fail here instead of inside PlistLoader on the device.
+    The document is written to a temporary file and moved into place.
+    """
+    with open_output(path) as f:
+        plistlib.dump(value, f, fmt=plist_formats[fmt], sort_keys=False)
+
+def write_plist_array(path, items, fmt='xml'):
+    """Serialize an iterable of plist values as a top-level array
+
+    XML is emitted one item at a time, so only the item being written is held
+    in memory, and the bytes match write_plist() on the equivalent list.
+    Binary plists need the whole object table, so the items are collected first.
+    """
+    if fmt != 'xml':
+        write_plist(path, list(items), fmt)
+        return
+    with open_output(path) as f:
+        header = plistlib.dumps([], fmt=plistlib.FMT_XML).splitlines(keepends=True)
+        f.writelines(header[:-2])
+        empty = True
+        for item in items:
+            if empty:
+                f.write(b'<array>\n')
+                empty = False
+            # Drop the XML declaration, DOCTYPE and <plist> wrapper and nest the item one level in
+            for line in plistlib.dumps(item, fmt=plistlib.FMT_XML, sort_keys=False).splitlines(keepends=True)[3:-1]:
+                f.write(b'\t' + line)
+        f.write(header[-2] if empty else b'</array>\n')
+        f.write(header[-1])
+
+def write_categories(path, catalog, lang_codes, fmt='xml'):
+    """Write the catalog's categories, restricted to the given languages, as a plist array
+
+    The array holds every language of a category together, so it is streamed from
+    the catalog a category at a time rather than assembled from the per-language reads.
+    """
+    write_plist_array(path, catalog.iter_categories(lang_codes), fmt)
+
+def map_jobs(executor, fn, *iterables):
+    """Map fn over the iterables in order, in the process pool when there is one"""
+    if executor is None:
+        return list(map(fn, *iterables))
+    return list(executor.map(fn, *iterables))
+
+def parse_formats(values):
+    """Resolve --format arguments (FORMAT or ARTIFACT=FORMAT) into a format per artifact"""
+    formats = dict.fromkeys(artifacts, 'xml')
+    for value in values or []:
+        artifact, _, fmt = value.rpartition('=')
+        if fmt not in plist_formats:
+            raise ValueError(f"Unknown plist format '{fmt}', expected one of: {', '.join(plist_formats)}")
+        if not artifact:
+            formats = dict.fromkeys(artifacts, fmt)
+        elif artifact in formats:
+            formats[artifact] = fmt
+        else:
+            raise ValueError(f"Unknown artifact '{artifact}', expected one of: {', '.join(artifacts)}")
+    return formats
+
+def digest(*parts):
+    """Return a hex SHA-256 over the given strings or bytes"""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode('utf-8') if isinstance(part, str) else part)
+        h.update(b'\0')
+    return h.hexdigest()
+
+def value_digest(value):
+    """Return a digest of a plist value, sensitive to key order as the output is"""
+    return digest(json.dumps(value, ensure_ascii=False, default=str))
+
+def file_digest(path):
+    """Return a digest of a file's bytes, or of its absence"""
+    try:
+        with open(path, 'rb') as f:
+            return digest(f.read())
+    except FileNotFoundError:
+        return digest('missing')
+
+def stat_signature(path):
+    """Return (path, size, mtime) for a file, or (path, None, None) if it is missing"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return (path, None, None)
+    return (path, st.st_size, st.st_mtime_ns)
+
+class BuildCache:
+    """Skips rewriting outputs whose inputs are unchanged since the last run
+
+    Every output is recorded in the manifest with a key derived from the
+    inputs it was built from. An output is only rewritten when its key
+    changes or the file is missing, so Xcode does not see a new mtime for
+    resources whose content could not have changed.
+    """
+
+    def __init__(self, output_dir, force=False):
+        self.output_dir = output_dir
+        self.force = force
+        self.previous = self.load_manifest(output_dir)
+        self.outputs = {}
+        self.sources = {}
+        self.pending = []
+        self.written = []
+        self.skipped = []
+
+    @staticmethod
+    def load_manifest(output_dir):
+        """Return the manifest from the last run, or an empty one"""
+        try:
+            with open(os.path.join(output_dir, manifest_name), encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+        return manifest if manifest.get('version') == cache_version else {}
+
+    def is_up_to_date(self, fingerprint):
+        """Whether the last run used identical inputs and all of its outputs still exist"""
+        if self.force or self.previous.get('fingerprint') != fingerprint:
+            return False
+        return all(os.path.exists(os.path.join(self.output_dir, name))
+                   for name in self.previous.get('outputs', {}))
+
+    @staticmethod
+    def output_key(fmt, key):
+        """Return the manifest key of an output built from key in the given format"""
+        return digest(str(cache_version), fmt, key)
+
+    def is_current(self, filename, key):
+        """Whether the manifest shows the output was built from key and the file still exists"""
+        return (not self.force and self.previous.get('outputs', {}).get(filename) == key
+                and os.path.exists(os.path.join(self.output_dir, filename)))
+
+    def stale(self, filename, fmt, key):
+        """Record an output and return its path if it must be written, or None if it is up to date"""
+        key = self.output_key(fmt, key)
+        self.outputs[filename] = key
+        if self.is_current(filename, key):
+            self.skipped.append(filename)
+            return None
+        return os.path.join(self.output_dir, filename)
+
+    def record(self, filename, key, written):
+        """Record an output that was checked, and written if stale, outside this cache, e.g. in a worker"""
+        self.outputs[filename] = key
+        (self.written if written else self.skipped).append(filename)
+
+    def queue(self, filenames, emit, *args):
+        """Queue emit(*args), which writes the given outputs
+
+        emit and args must be picklable so run() can hand them to a process pool.
+        """
+        self.pending.append((filenames, emit, args))
+
+    def write(self, filename, fmt, key, emit, *args):
+        """Queue emit(path, *args, fmt) unless the manifest shows the output was built from the same key"""
+        path = self.stale(filename, fmt, key)
+        if path is not None:
+            self.queue([filename], emit, path, *args, fmt)
+
+    def run(self, executor=None):
+        """Run every queued write, in the process pool when there is one"""
+        pending, self.pending = self.pending, []
+        if executor is None:
+            for filenames, emit, args in pending:
+                emit(*args)
+                self.written.extend(filenames)
+            return
+        futures = [executor.submit(emit, *args) for _, emit, args in pending]
+        for (filenames, *_), future in zip(pending, futures):
+            future.result()
+            self.written.extend(filenames)
+
+    def finish(self, fingerprint):
+        """Remove outputs that are no longer generated and save the manifest"""
+        for filename in self.previous.get('outputs', {}):
+            if filename not in self.outputs:
+                path = os.path.join(self.output_dir, filename)
+                if os.path.exists(path):
+                    os.remove(path)
+                directory = os.path.dirname(path)
+                if (os.path.normpath(directory) != os.path.normpath(self.output_dir)
+                        and os.path.isdir(directory) and not os.listdir(directory)):
+                    os.rmdir(directory)
+        manifest = {
+            'version': cache_version,
+            'fingerprint': fingerprint,
+            'sources': self.sources,
+            'outputs': self.outputs,
+        }
+        if manifest != self.previous:
+            with open(os.path.join(self.output_dir, manifest_name), 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+        print(f"{len(self.written)} written, {len(self.skipped)} unchanged")
+
+def source_digests(records, id_key, lang_codes, shard):
+    """Digest every record's content per language, as it appears in that language's shard"""
+    return {
+        record[id_key]: {lang_code: value_digest(shard([record], lang_code)) for lang_code in lang_codes}
+        for record in records
+    }
+
+def restrict_call_request_options(options, lang_codes):
+    """Reduce call request options to the labels of the given languages"""
+    restricted = []
+    for option in options:
+        restricted.append({
+            'type': option['type'],
+            'iconName': option['iconName'],
+            'labels': {k: v for k, v in option['labels'].items() if k in lang_codes},
+        })
+    return restricted
+
+def shard_call_request_options(options, lang_code):
+    """Reduce call request options to the labels of one language"""
+    return restrict_call_request_options(options, [lang_code])
+
+class StringTable:
+    """Interns strings so each distinct one is stored once and referenced by index"""
+
+    def __init__(self):
+        self.strings = []
+        self.indices = {}
+
+    def add(self, value):
+        """Return the index of value, appending it to the table the first time it is seen"""
+        index = self.indices.get(value)
+        if index is None:
+            index = self.indices[value] = len(self.strings)
+            self.strings.append(value)
+        return index
+
+def compact_resources(categories, lang_code, call_request_options):
+    """Build one language's categories and call request options against a shared string table
+
+    Display names, phrases and labels become indices into `strings`, so a phrase
+    that appears in several categories is stored and decoded once. Ids and icon
+    names are identifiers rather than text and stay inline.
+    """
+    table = StringTable()
+    entries = []
+    for category in categories:
+        entry = {'id': category['id']}
+        if lang_code in category['displayNames']:
+            entry['displayName'] = table.add(category['displayNames'][lang_code])
+        entry['phrases'] = [table.add(phrase) for phrase in category['phrases'].get(lang_code, [])]
+        entries.append(entry)
+    options = []
+    for option in call_request_options:
+        entry = {'type': option['type'], 'iconName': option['iconName']}
+        if lang_code in option['labels']:
+            entry['label'] = table.add(option['labels'][lang_code])
+        options.append(entry)
+    return {'strings': table.strings, 'categories': entries, 'callRequestOptions': options}
+
+def shard_key(cache, artifact, ids, lang_code):
+    """Combine the source digests of every record an artifact's shard for one language contains"""
+    return digest(*(cache.sources[artifact][record_id][lang_code] for record_id in ids))
+
+def normalize_search_text(text):
+    """Fold case and diacritics so a query matches phrases however it is accented or cased
+
+    Accents are only dropped from Latin, Greek and Cyrillic letters; in scripts such
+    as Devanagari, Bengali and Thai the combining marks are vowels and tone marks
+    that change the word. Arabic short vowels and tatweel are dropped, katakana is
+    folded to hiragana, and punctuation and runs of whitespace become one space.
+    """
+    folded = []
+    base = ''
+    for ch in unicodedata.normalize('NFKD', text.casefold()):
+        code = ord(ch)
+        if unicodedata.combining(ch) and (base < '\u0530' or '\u1e00' <= base < '\u2000'):
+            continue
+        if 0x064B <= code <= 0x065F or code in (0x0640, 0x0670):
+            continue
+        if 0x30A1 <= code <= 0x30F6:
+            ch = chr(code - 0x60)
+        if not unicodedata.combining(ch):
+            base = ch
+        if unicodedata.category(ch)[0] in 'PZ' or ch.isspace():
+            ch = ' '
+        folded.append(search_letter_folds.get(ch, ch))
+    return ' '.join(unicodedata.normalize('NFC', ''.join(folded)).split())
+
+def search_index(categories, lang_code):
+    """Build the phrase search index for one language
+
+    Every phrase is an entry, identified by entryCategories[i] (an index into
+    categories) and entryPhrases[i] (the phrase's index in that category).
+    grams maps every gramSize-long substring of the normalized phrase text to the
+    entries containing it, and prefixes maps the shorter substrings that start a
+    word to the entries containing them. To search, normalize the query the same
+    way; a query of at least gramSize characters intersects the postings of its
+    grams and confirms each candidate against normalized[i], and a shorter query
+    is looked up in prefixes directly.
+    """
+    gram_size = search_gram_sizes.get(lang_code, default_search_gram_size)
+    index = {
+        'gramSize': gram_size,
+        'categories': [],
+        'entryCategories': [],
+        'entryPhrases': [],
+        'normalized': [],
+    }
+    grams = {}
+    prefixes = {}
+
+    def post(table, key, entry):
+        postings = table.setdefault(key, [])
+        if not postings or postings[-1] != entry:
+            postings.append(entry)
+
+    for category in categories:
+        category_index = len(index['categories'])
+        index['categories'].append(category['id'])
+        for phrase_index, phrase in enumerate(category['phrases'].get(lang_code, [])):
+            entry = len(index['normalized'])
+            text = normalize_search_text(phrase)
+            index['entryCategories'].append(category_index)
+            index['entryPhrases'].append(phrase_index)
+            index['normalized'].append(text)
+            for start in range(len(text)):
+                if start + gram_size <= len(text):
+                    post(grams, text[start:start + gram_size], entry)
+                if text[start] == ' ':
+                    continue
+                if start == 0 or text[start - 1] == ' ' or lang_code in unsegmented_languages:
+                    for length in range(1, gram_size):
+                        prefix = text[start:start + length]
+                        if len(prefix) < length or ' ' in prefix:
+                            break
+                        post(prefixes, prefix, entry)
+    index['grams'] = {gram: grams[gram] for gram in sorted(grams)}
+    index['prefixes'] = {prefix: prefixes[prefix] for prefix in sorted(prefixes)}
+    return index
+
+def search(index, query):
+    """Return (category id, phrase index) for every phrase matching query, in catalog order
+
+    Reference implementation of the lookup the app performs against a search index.
+    """
+    text = normalize_search_text(query)
+    gram_size = index['gramSize']
+    if not text:
+        return []
+    if len(text) < gram_size:
+        entries = index['prefixes'].get(text, [])
+    else:
+        postings = [index['grams'].get(text[i:i + gram_size], []) for i in range(len(text) - gram_size + 1)]
+        candidates = set(min(postings, key=len))
+        for other in postings:
+            candidates.intersection_update(other)
+        entries = sorted(entry for entry in candidates if text in index['normalized'][entry])
+    return [(index['categories'][index['entryCategories'][entry]], index['entryPhrases'][entry]) for entry in entries]
+
+# Per-language artifacts built from the language's categories
+category_artifacts = ('SoundboardCategories', 'CompactResources', 'SearchIndex')
+
+def write_language_outputs(catalog, lang_code, outputs, categories):
+    """Emit the given per-language artifacts of one language from its categories
+
+    outputs lists (artifact, path, format).
+    """
+    for artifact, path, fmt in outputs:
+        if artifact == 'SoundboardCategories':
+            value = categories
+        elif artifact == 'CallRequestOptions':
+            value = shard_call_request_options(catalog.call_request_options, lang_code)
+        elif artifact == 'CompactResources':
+            value = compact_resources(categories, lang_code, catalog.call_request_options)
+        elif artifact == 'SearchIndex':
+            value = search_index(categories, lang_code)
+        else:
+            value = catalog.ui_strings(lang_code)
+        write_plist(path, value, fmt)
+
+def language_outputs(cache, catalog, lang_code, sharded, compact, with_search_index):
+    """Return (artifact, filename) for every per-language output of one language"""
+    outputs = []
+    if lang_code in cache.sources['Localizable']:
+        outputs.append(('Localizable', f'{lang_code}.lproj/Localizable.strings'))
+    if sharded:
+        outputs.append(('SoundboardCategories', f'SoundboardCategories.{lang_code}.plist'))
+        if any(lang_code in option['labels'] for option in catalog.call_request_options):
+            outputs.append(('CallRequestOptions', f'CallRequestOptions.{lang_code}.plist'))
+    if compact:
+        outputs.append(('CompactResources', f'CompactResources.{lang_code}.plist'))
+    if with_search_index:
+        outputs.append(('SearchIndex', f'SearchIndex.{lang_code}.plist'))
+    return outputs
+
+def build_language(cache, catalog, lang_code, outputs, formats):
+    """Read one language's catalog slice once, digest it and write its stale per-language outputs
+
+    outputs lists (artifact, filename) from language_outputs(). Each phrase file
+    is read a single time; its phrases are digested and, when a per-language
+    artifact is built from categories, kept to build it. cache is only read, so
+    this can run in a worker process. Returns the category digests, in catalog
+    order, and (filename, key, written) for every output.
+    """
+    keep = any(artifact in category_artifacts for artifact, _ in outputs)
+    categories = []
+    digests = []
+    for category in catalog.iter_categories([lang_code]):
+        category['phrases'] = {code: list(phrases) for code, phrases in category['phrases'].items()}
+        digests.append(value_digest(category))
+        if keep:
+            categories.append(category)
+
+    categories_key = digest(*digests)
+    types = [option['type'] for option in catalog.call_request_options]
+    options_key = shard_key(cache, 'CallRequestOptions', types, lang_code)
+    keys = {
+        'Localizable': cache.sources['Localizable'].get(lang_code),
+        'SoundboardCategories': categories_key,
+        'CallRequestOptions': options_key,
+        'CompactResources': digest(categories_key, options_key),
+        'SearchIndex': categories_key,
+    }
+    records = []
+    stale = []
+    for artifact, filename in outputs:
+        fmt = localizable_format if artifact == 'Localizable' else formats[artifact]
+        key = cache.output_key(fmt, keys[artifact])
+        written = not cache.is_current(filename, key)
+        records.append((filename, key, written))
+        if written:
+            stale.append((artifact, os.path.join(cache.output_dir, filename), fmt))
+    write_language_outputs(catalog, lang_code, stale, categories)
+    return digests, records
+
+def input_fingerprint(catalog, options):
+    """Fingerprint the generator, the options and the inputs' size and mtime, cheap enough for every build"""
+    parts = [file_digest(os.path.abspath(__file__)), json.dumps(options, sort_keys=True)]
+    parts += [json.dumps(signature) for signature in catalog.stat_signature()]
+    return digest(*parts)
+
+# Generate every resource from the catalog in one pass
+def generate_plist(catalog_dir=default_catalog_dir, output_dir=default_output_dir, lang_codes=None,
+                   category_ids=None, sharded=False, compact=False, with_search_index=False, formats=None,
+                   force=False, jobs=1):
+    formats = formats or parse_formats(None)
+    catalog = Catalog(catalog_dir, lang_codes, category_ids)
+    os.makedirs(output_dir, exist_ok=True)
+    cache = BuildCache(output_dir, force=force)
+    fingerprint = input_fingerprint(catalog, {
+        'catalog': os.path.abspath(catalog_dir), 'languages': catalog.languages,
+        'categories': catalog.category_ids, 'sharded': sharded, 'compact': compact,
+        'search_index': with_search_index, 'formats': formats,
+    })
+    if cache.is_up_to_date(fingerprint):
+        print("Resources are up to date")
+        return
+
+    # Hashing and writing are independent per language and per output; with --jobs they
+    # run in a process pool while everything order-dependent is assembled here
+    executor = concurrent.futures.ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    try:
+        cache.sources['CallRequestOptions'] = source_digests(
+            catalog.call_request_options, 'type', catalog.languages, shard_call_request_options)
+        cache.sources['Localizable'] = {
+            lang_code: file_digest(catalog.strings_path(lang_code)) for lang_code in catalog.languages
+            if os.path.exists(catalog.strings_path(lang_code))
+        }
+
+        # Each language's phrases are read once, both to digest them and to build that language's outputs
+        plans = [language_outputs(cache, catalog, lang_code, sharded, compact, with_search_index)
+                 for lang_code in catalog.languages]
+        n = len(catalog.languages)
+        results = map_jobs(executor, build_language, [cache] * n, [catalog] * n, catalog.languages, plans,
+                           [formats] * n)
+
+        index = {
+            'categories': catalog.category_ids,
+            'callRequestTypes': [option['type'] for option in catalog.call_request_options],
+            'languages': [],
+            'shards': {},
+        }
+        for lang_code, outputs, (_, records) in zip(catalog.languages, plans, results):
+            for artifact, filename in outputs:
+                if artifact != 'Localizable':
+                    index['shards'].setdefault(artifact, {})[lang_code] = filename
+            for record in records:
+                cache.record(*record)
+        digests = {
+            category_id: {lang_code: results[j][0][i] for j, lang_code in enumerate(catalog.languages)}
+            for i, category_id in enumerate(catalog.category_ids)
+        }
+        cache.sources['SoundboardCategories'] = digests
+
+        key = digest(*(digests[category_id][lang_code]
+                       for category_id in catalog.category_ids for lang_code in catalog.languages))
+        cache.write('SoundboardCategories.plist', formats['SoundboardCategories'], key,
+                    write_categories, catalog, catalog.languages)
+        call_request_options = restrict_call_request_options(catalog.call_request_options, catalog.languages)
+        cache.write('CallRequestOptions.plist', formats['CallRequestOptions'], value_digest(call_request_options),
+                    write_plist, call_request_options)
+
+        if sharded or compact or with_search_index:
+            index['languages'] = [
+                code for code in languages
+                if any(code in shards for shards in index['shards'].values())
+            ]
+            cache.write(shard_index_name, formats['ResourceIndex'], value_digest(index), write_plist, index)
+            print(f"Shards cover {len(index['languages'])} languages in {cache.output_dir}")
+        cache.run(executor)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    print("Resources generated successfully!")
+    cache.finish(fingerprint)
+
+def split_codes(value):
+    """Parse a comma-separated command line list"""
+    return [code.strip() for code in value.split(',') if code.strip()]
 
 if __name__ == "__main__":
-    generate_plist()
+    parser = argparse.ArgumentParser(description='Generate soundboard resource plists')
+    parser.add_argument('--catalog-dir', default=default_catalog_dir,
+                        help='directory holding categories.json, call_requests.json, '
+                             'phrases/<lang>/<category>.txt and strings/<lang>.json')
+    parser.add_argument('--output-dir', default=default_output_dir,
+                        help='directory the generated plists are written to')
+    parser.add_argument('--languages', type=split_codes, metavar='CODES',
+                        help='comma-separated language codes to generate (default: all in the catalog)')
+    parser.add_argument('--categories', type=split_codes, metavar='IDS',
+                        help='comma-separated category ids to generate (default: all in the catalog)')
+    parser.add_argument('--sharded', action='store_true',
+                        help='also write one SoundboardCategories/CallRequestOptions plist per language and an index')
+    parser.add_argument('--compact', action='store_true',
+                        help='also write one CompactResources plist per language, with every distinct string '
+                             'stored once in a string table and referenced by index')
+    parser.add_argument('--search-index', action='store_true',
+                        help='also write one SearchIndex plist per language, mapping case- and diacritic-folded '
+                             'phrase text to (category, phrase index)')
+    parser.add_argument('--format', action='append', metavar='[ARTIFACT=]FORMAT',
+                        help='plist output format (xml or binary), for every artifact or just the named one; '
+                             f"artifacts: {', '.join(artifacts)}")
+    parser.add_argument('--force', action='store_true',
+                        help='ignore the build manifest and rewrite every output')
+    parser.add_argument('--jobs', type=int, default=1, metavar='N',
+                        help='hash and write outputs in N worker processes (output is identical to a serial run)')
+    args = parser.parse_args()
+    if args.jobs < 1:
+        parser.error('--jobs must be at least 1')
+    try:
+        formats = parse_formats(args.format)
+        generate_plist(catalog_dir=args.catalog_dir, output_dir=args.output_dir, lang_codes=args.languages,
+                       category_ids=args.categories, sharded=args.sharded, compact=args.compact,
+                       with_search_index=args.search_index, formats=formats, force=args.force, jobs=args.jobs)
+    except ValueError as e:
+        parser.error(str(e))
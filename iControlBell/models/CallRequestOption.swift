@@ -39,7 +39,11 @@ class CallRequestData: ObservableObject {
     /// Loads call request options for the given language from the Plist.
     func loadOptions(for language: Language) {
         self.language = language
-        guard let loaded: [CallRequestOption] = PlistLoader.load("CallRequestOptions") else {
+        if let compact = CompactResources.load(for: language) {
+            self.options = compact.callRequestOptions(for: language)
+            return
+        }
+        guard let loaded: [CallRequestOption] = PlistLoader.load("CallRequestOptions", languageCode: language.rawValue) else {
             print("[CallRequestData] Failed to load CallRequestOptions.plist for language: \(language.rawValue)")
             self.options = []
             return
@@ -0,0 +1,60 @@
+// CompactResources.swift
+// Per-language resources with a shared string table
+
+import Foundation
+
+/// One language's soundboard categories and call request options as written by
+/// `generate_plist.py --compact`. Every distinct display name, phrase and label is stored
+/// once in `strings` and referenced by index, so repeated phrases are decoded only once.
+struct CompactResources: Decodable {
+    struct Category: Decodable {
+        let id: String
+        let displayName: Int?
+        let phrases: [Int]
+    }
+
+    struct Option: Decodable {
+        let type: String
+        let iconName: String
+        let label: Int?
+    }
+
+    let strings: [String]
+    let categories: [Category]
+    let callRequestOptions: [Option]
+
+    /// Loads the compact resources for the given language, or nil if none are bundled.
+    static func load(for language: Language) -> CompactResources? {
+        let filename = "CompactResources.\(language.rawValue)"
+        guard PlistLoader.exists(filename) else { return nil }
+        return PlistLoader.load(filename)
+    }
+
+    /// Returns the string at the given table index, or nil if it is missing or out of range.
+    private func string(at index: Int?) -> String? {
+        guard let index = index, strings.indices.contains(index) else { return nil }
+        return strings[index]
+    }
+
+    /// Expands the categories into the models used by the soundboard.
+    func soundboardCategories(for language: Language) -> [SoundboardCategory] {
+        categories.map { category in
+            SoundboardCategory(
+                id: category.id,
+                displayNames: string(at: category.displayName).map { [language.rawValue: $0] } ?? [:],
+                phrases: [language.rawValue: category.phrases.compactMap { string(at: $0) }]
+            )
+        }
+    }
+
+    /// Expands the call request options into the models used by the call request grid.
+    func callRequestOptions(for language: Language) -> [CallRequestOption] {
+        callRequestOptions.map { option in
+            CallRequestOption(
+                type: option.type,
+                iconName: option.iconName,
+                labels: string(at: option.label).map { [language.rawValue: $0] } ?? [:]
+            )
+        }
+    }
+}
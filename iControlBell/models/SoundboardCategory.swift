@@ -33,7 +33,11 @@ class SoundboardData: ObservableObject {
     /// Loads soundboard categories for the given language from the Plist.
     func loadCategories(for language: Language) {
         self.language = language
-        guard let loaded: [SoundboardCategory] = PlistLoader.load("SoundboardCategories") else {
+        if let compact = CompactResources.load(for: language) {
+            self.categories = compact.soundboardCategories(for: language)
+            return
+        }
+        guard let loaded: [SoundboardCategory] = PlistLoader.load("SoundboardCategories", languageCode: language.rawValue) else {
             print("[SoundboardData] Failed to load SoundboardCategories.plist for language: \(language.rawValue)")
             self.categories = []
             return
@@ -2,6 +2,23 @@ import Foundation
 
 /// Loads and decodes Plist files from the app bundle.
 struct PlistLoader {
+    /// Returns whether a plist with the given name is bundled.
+    /// - Parameter filename: The name of the plist file (without extension).
+    static func exists(_ filename: String) -> Bool {
+        Bundle.main.url(forResource: filename, withExtension: "plist") != nil
+    }
+
+    /// Loads the per-language shard of a resource (e.g. `SoundboardCategories.es`) written by
+    /// `generate_plist.py --sharded`, falling back to the monolithic plist when no shard is bundled.
+    /// - Parameters:
+    ///   - filename: The name of the monolithic plist file (without extension).
+    ///   - languageCode: The language code of the shard to prefer.
+    /// - Returns: The decoded object, or nil if loading or decoding fails.
+    static func load<T: Decodable>(_ filename: String, languageCode: String) -> T? {
+        let shard = "\(filename).\(languageCode)"
+        return load(exists(shard) ? shard : filename)
+    }
+
     /// Loads and decodes a plist file into the specified Decodable type.
     /// - Parameter filename: The name of the plist file (without extension).
     /// - Returns: The decoded object, or nil if loading or decoding fails.
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+
+# Script to import SoundboardCategories and CallRequestOptions plists (our own or
+# translation vendors' deliveries) into generate_plist.py's source catalog
+#
+# Input is stream-parsed: only the elements on the path to the value being read
+# are held, phrases are written to the catalog as they arrive, and each category's
+# coverage against `languages` and categories.json is reported as soon as it ends.
+
+import argparse
+import itertools
+import json
+import os
+import shutil
+import tempfile
+import xml.etree.ElementTree as ET
+
+import generate_plist
+from generate_plist import languages
+
+# How imported content is combined with what the catalog already has
+merge_modes = {
+    'fill': 'only add phrases, names and labels the catalog is missing',
+    'union': 'also append imported phrases that are not yet in an existing phrase file',
+    'replace': 'overwrite the catalog with everything imported',
+}
+
+# Imported phrases compared against an existing phrase file per pass in union mode
+union_batch_size = 100000
+
+def plist_scalar(elem):
+    """Convert a scalar plist element to its Python value"""
+    if elem.tag == 'integer':
+        return int(elem.text)
+    if elem.tag == 'real':
+        return float(elem.text)
+    if elem.tag in ('true', 'false'):
+        return elem.tag == 'true'
+    return elem.text or ''
+
+def iter_plist_events(path):
+    """Stream an XML plist as ('value', path, value) and ('end', path) events
+
+    path is the tuple of dict keys and array indices leading to the value, or
+    to the dict or array that just ended. Every element is removed from its
+    parent once it has been read, so memory does not grow with the file.
+    """
+    with open(path, 'rb') as f:
+        if f.read(8) == b'bplist00':
+            raise ValueError(f'{path} is a binary plist; convert it first with: plutil -convert xml1 {path}')
+
+    open_elements = []
+    # One frame per open dict or array: [tag, key or index of the next child]
+    containers = []
+    for event, elem in ET.iterparse(path, events=('start', 'end')):
+        if event == 'start':
+            open_elements.append(elem)
+            if elem.tag in ('dict', 'array'):
+                containers.append([elem.tag, 0 if elem.tag == 'array' else None])
+            continue
+
+        open_elements.pop()
+        if elem.tag == 'key':
+            containers[-1][1] = elem.text or ''
+        elif elem.tag in ('dict', 'array'):
+            containers.pop()
+            yield ('end', tuple(frame[1] for frame in containers))
+            advance(containers)
+        elif elem.tag != 'plist' and containers:
+            yield ('value', tuple(frame[1] for frame in containers), plist_scalar(elem))
+            advance(containers)
+        elem.clear()
+        if open_elements:
+            open_elements[-1].remove(elem)
+
+def advance(containers):
+    """Move the innermost container on to its next child slot"""
+    if containers:
+        frame = containers[-1]
+        frame[1] = frame[1] + 1 if frame[0] == 'array' else None
+
+def format_languages(codes):
+    """Format language codes compactly, collapsing runs in `languages` order into ranges"""
+    order = list(languages)
+    positions = sorted(order.index(code) for code in codes)
+    runs = []
+    for position in positions:
+        if runs and runs[-1][1] == position - 1:
+            runs[-1][1] = position
+        else:
+            runs.append([position, position])
+    parts = []
+    for start, end in runs:
+        if end - start >= 2:
+            parts.append(f'{order[start]} through {order[end]}')
+        else:
+            parts.extend(order[i] for i in range(start, end + 1))
+    return ', '.join(parts)
+
+class CatalogImporter:
+    """Merges streamed plist content into a catalog directory
+
+    Phrases are written to a scratch file as they are parsed and moved into
+    the catalog when their category ends, since a category's id may follow
+    its phrases. Display names and call request labels are small and are
+    kept until the import finishes.
+    """
+
+    def __init__(self, catalog_dir, merge='fill'):
+        self.catalog_dir = catalog_dir
+        self.merge = merge
+        try:
+            with open(os.path.join(catalog_dir, 'categories.json'), encoding='utf-8') as f:
+                self.category_names = json.load(f)
+        except FileNotFoundError:
+            self.category_names = {}
+        try:
+            with open(os.path.join(catalog_dir, 'call_requests.json'), encoding='utf-8') as f:
+                self.call_request_options = json.load(f)
+        except FileNotFoundError:
+            self.call_request_options = []
+        # language code -> category ids the import delivered phrases for
+        self.coverage = {code: set() for code in languages}
+        # Ordered set of imported category ids, a category imported twice counts once
+        self.imported_categories = {}
+        self.imported_call_requests = False
+        self.phrase_count = 0
+        self.warnings = 0
+
+    def warn(self, message):
+        self.warnings += 1
+        print(f'  warning: {message}')
+
+    def phrases_path(self, lang_code, category_id):
+        return os.path.join(self.catalog_dir, 'phrases', lang_code, f'{category_id}.txt')
+
+    def import_soundboard(self, path):
+        """Stream a SoundboardCategories plist into the catalog"""
+        print(f'Importing soundboard categories from {path}')
+        scratch_dir = tempfile.mkdtemp(prefix='.import-', dir=self.catalog_dir)
+        try:
+            category = None
+            scratch = None
+            for event in iter_plist_events(path):
+                kind, location = event[0], event[1]
+                if kind == 'value' and len(location) >= 2:
+                    if category is None or category['index'] != location[0]:
+                        category = {'index': location[0], 'id': None, 'names': {}, 'phrases': {}}
+                    value = event[2]
+                    if location[1:] == ('id',):
+                        category['id'] = value
+                    elif len(location) == 3 and location[1] == 'displayNames':
+                        category['names'][location[2]] = value
+                    elif len(location) == 4 and location[1] == 'phrases':
+                        lang_code = location[2]
+                        if lang_code not in languages:
+                            if lang_code not in category['phrases']:
+                                category['phrases'][lang_code] = None
+                                self.warn(f"unknown language code '{lang_code}' in category #{location[0]} phrases")
+                            continue
+                        if lang_code not in category['phrases']:
+                            if scratch is not None:
+                                scratch.close()
+                            scratch_path = os.path.join(scratch_dir, f"{category['index']}.{len(category['phrases'])}")
+                            category['phrases'][lang_code] = scratch_path
+                            scratch = open(scratch_path, 'w', encoding='utf-8')
+                        if not isinstance(value, str) or not value.strip():
+                            continue
+                        if '\n' in value or '\r' in value:
+                            self.warn(f'line break in a {lang_code} phrase replaced with a space: {value!r}')
+                            value = ' '.join(value.splitlines())
+                        scratch.write(value + '\n')
+                        self.phrase_count += 1
+                elif kind == 'end' and len(location) == 1 and category is not None:
+                    if scratch is not None:
+                        scratch.close()
+                        scratch = None
+                    self.finish_category(category)
+                    category = None
+            if scratch is not None:
+                scratch.close()
+        finally:
+            shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    def finish_category(self, category):
+        """Merge one parsed category into the catalog and report what it lacks"""
+        category_id = category['id']
+        if not category_id:
+            self.warn(f"category #{category['index']} has no id and was skipped")
+            return
+        # Ids become file names under phrases/<lang>/, and vendor files are not trusted
+        if (not isinstance(category_id, str) or category_id.startswith('.') or '/' in category_id
+                or os.sep in category_id or (os.altsep and os.altsep in category_id)):
+            self.warn(f"category #{category['index']} has an invalid id {category_id!r} and was skipped")
+            return
+        self.imported_categories[category_id] = None
+        names = self.category_names.setdefault(category_id, {})
+        for lang_code, name in category['names'].items():
+            if lang_code not in languages:
+                self.warn(f"unknown language code '{lang_code}' in {category_id} display names")
+            elif self.merge == 'replace' or lang_code not in names:
+                names[lang_code] = name
+
+        for lang_code, scratch_path in category['phrases'].items():
+            if scratch_path is None or os.path.getsize(scratch_path) == 0:
+                continue
+            self.coverage[lang_code].add(category_id)
+            self.merge_phrases(scratch_path, self.phrases_path(lang_code, category_id))
+
+        missing_phrases = [code for code in languages if category_id not in self.coverage[code]]
+        missing_names = [code for code in languages if code not in names]
+        status = f'  {category_id}: phrases in {len(languages) - len(missing_phrases)}/{len(languages)} languages'
+        if missing_phrases:
+            status += f'; missing {format_languages(missing_phrases)}'
+        print(status)
+        if missing_names:
+            print(f'  {category_id}: no display name for {format_languages(missing_names)}')
+
+    def merge_phrases(self, scratch_path, target_path):
+        """Combine one imported phrase list with the catalog's file according to the merge mode"""
+        exists = os.path.exists(target_path) and os.path.getsize(target_path) > 0
+        if exists and self.merge == 'fill':
+            return
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        if not exists or self.merge == 'replace':
+            shutil.move(scratch_path, target_path)
+            return
+        # Compare a bounded batch of imported phrases against one pass over the existing
+        # file at a time, so neither file is ever held in memory whole
+        with open(scratch_path, encoding='utf-8') as src:
+            imported = (line.rstrip('\r\n') for line in src)
+            while True:
+                batch = dict.fromkeys(itertools.islice(imported, union_batch_size))
+                if not batch:
+                    break
+                with open(target_path, encoding='utf-8') as f:
+                    for line in f:
+                        batch.pop(line.rstrip('\r\n'), None)
+                if not batch:
+                    continue
+                with open(target_path, 'rb') as f:
+                    f.seek(-1, os.SEEK_END)
+                    newline = f.read(1) not in (b'\n', b'\r')
+                with open(target_path, 'a', encoding='utf-8') as dst:
+                    if newline:
+                        dst.write('\n')
+                    dst.writelines(phrase + '\n' for phrase in batch)
+
+    def import_call_requests(self, path):
+        """Stream a CallRequestOptions plist into the catalog"""
+        print(f'Importing call request options from {path}')
+        self.imported_call_requests = True
+        by_type = {option['type']: option for option in self.call_request_options}
+        option = None
+        for event in iter_plist_events(path):
+            kind, location = event[0], event[1]
+            if kind == 'value' and len(location) >= 2:
+                if option is None:
+                    option = {'labels': {}}
+                if len(location) == 2 and location[1] in ('type', 'iconName'):
+                    option[location[1]] = event[2]
+                elif len(location) == 3 and location[1] == 'labels':
+                    option['labels'][location[2]] = event[2]
+            elif kind == 'end' and len(location) == 1 and option is not None:
+                self.finish_call_request(option, by_type)
+                option = None
+
+    def finish_call_request(self, option, by_type):
+        """Merge one parsed call request option into the catalog and report what it lacks"""
+        option_type = option.get('type')
+        if not option_type:
+            self.warn('call request option without a type was skipped')
+            return
+        existing = by_type.get(option_type)
+        if existing is None:
+            existing = by_type[option_type] = {'type': option_type, 'iconName': option.get('iconName', ''), 'labels': {}}
+            self.call_request_options.append(existing)
+        elif self.merge == 'replace' and option.get('iconName'):
+            existing['iconName'] = option['iconName']
+        for lang_code, label in option['labels'].items():
+            if lang_code not in languages:
+                self.warn(f"unknown language code '{lang_code}' in {option_type} labels")
+            elif self.merge == 'replace' or lang_code not in existing['labels']:
+                existing['labels'][lang_code] = label
+        missing = [code for code in languages if code not in existing['labels']]
+        if missing:
+            print(f'  {option_type}: no label for {format_languages(missing)}')
+
+    def save(self):
+        """Write the merged category table and call request options that were imported into and summarize coverage"""
+        outputs = []
+        if self.imported_categories:
+            outputs.append(('categories.json', self.category_names))
+        if self.imported_call_requests:
+            outputs.append(('call_requests.json', self.call_request_options))
+        for name, value in outputs:
+            path = os.path.join(self.catalog_dir, name)
+            with open(path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(value, f, ensure_ascii=False, indent=4)
+                f.write('\n')
+            os.replace(path + '.tmp', path)
+
+        print(f'Imported {self.phrase_count} phrases in {len(self.imported_categories)} categories')
+        not_imported = [category_id for category_id in self.category_names
+                        if category_id not in self.imported_categories]
+        if self.imported_categories and not_imported:
+            print(f"Categories in categories.json missing from the import: {', '.join(not_imported)}")
+        if self.imported_categories:
+            uncovered = [code for code in languages if not self.coverage[code]]
+            partial = [code for code in languages
+                       if self.coverage[code] and len(self.coverage[code]) < len(self.imported_categories)]
+            if uncovered:
+                print(f'No phrases imported for {format_languages(uncovered)}')
+            if partial:
+                print(f'Phrases missing for some categories in {format_languages(partial)}')
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Import soundboard resource plists into the phrase catalog')
+    parser.add_argument('--catalog-dir', default=generate_plist.default_catalog_dir,
+                        help='catalog directory to merge into')
+    parser.add_argument('--soundboard', action='append', default=[], metavar='PATH',
+                        help='SoundboardCategories plist to import (repeatable)')
+    parser.add_argument('--call-requests', action='append', default=[], metavar='PATH',
+                        help='CallRequestOptions plist to import (repeatable)')
+    parser.add_argument('--merge', choices=merge_modes, default='fill',
+                        help='; '.join(f'{mode}: {description}' for mode, description in merge_modes.items()))
+    args = parser.parse_args()
+    if not args.soundboard and not args.call_requests:
+        parser.error('nothing to import; pass --soundboard and/or --call-requests')
+
+    os.makedirs(args.catalog_dir, exist_ok=True)
+    importer = CatalogImporter(args.catalog_dir, merge=args.merge)
+    try:
+        for path in args.soundboard:
+            importer.import_soundboard(path)
+        for path in args.call_requests:
+            importer.import_call_requests(path)
+    except (ValueError, ET.ParseError) as e:
+        parser.error(str(e))
+    importer.save()
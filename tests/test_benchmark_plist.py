@@ -0,0 +1,37 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import benchmark_plist
+
+class BudgetTests(unittest.TestCase):
+    def test_accepts_known_modes_and_fields(self):
+        benchmark_plist.validate_budgets({'*': {'generate_seconds': 30}, 'sharded-binary': {'switch_bytes': 200000}})
+
+    def test_rejects_unknown_mode(self):
+        with self.assertRaisesRegex(ValueError, "Unknown budget mode 'sharded_binary'"):
+            benchmark_plist.validate_budgets({'sharded_binary': {'switch_bytes': 1}})
+
+    def test_rejects_unknown_field(self):
+        with self.assertRaisesRegex(ValueError, "Unknown budget field 'switch_byte'"):
+            benchmark_plist.validate_budgets({'*': {'switch_byte': 1}})
+
+    def test_rejects_non_numeric_limit(self):
+        with self.assertRaisesRegex(ValueError, 'must be a number'):
+            benchmark_plist.validate_budgets({'*': {'switch_bytes': '1'}})
+
+    def test_reports_results_over_budget(self):
+        results = [
+            {'mode': 'sharded-binary', 'languages': 28, 'categories': 5, 'phrases': 10, 'switch_bytes': 500},
+            {'mode': 'monolithic-xml', 'languages': 28, 'categories': 5, 'phrases': 10, 'switch_bytes': 5000},
+        ]
+        violations = benchmark_plist.check_budgets(results, {'*': {'switch_bytes': 1000},
+                                                             'sharded-binary': {'switch_bytes': 100}})
+        self.assertEqual(len(violations), 2)
+        self.assertIn('sharded-binary', violations[0])
+        self.assertIn('monolithic-xml', violations[1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,237 @@
+import contextlib
+import io
+import json
+import os
+import plistlib
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import generate_plist
+
+class WritePlistTests(unittest.TestCase):
+    phrase = 'Tom & Jerry <3 ]]>'
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+
+    def load(self, path):
+        with open(path, 'rb') as f:
+            return plistlib.load(f)
+
+    def test_escapes_markup_in_phrases(self):
+        items = [{'id': 'test', 'phrases': {'en': [self.phrase]}}]
+        for fmt in generate_plist.plist_formats:
+            plain = os.path.join(self.dir, f'plain.{fmt}.plist')
+            streamed = os.path.join(self.dir, f'streamed.{fmt}.plist')
+            generate_plist.write_plist(plain, items, fmt)
+            generate_plist.write_plist_array(streamed, iter(items), fmt)
+            self.assertEqual(self.load(plain), items)
+            self.assertEqual(self.load(streamed), items)
+            with open(plain, 'rb') as a, open(streamed, 'rb') as b:
+                self.assertEqual(a.read(), b.read())
+
+    def test_rejects_control_characters_with_file_and_line(self):
+        catalog_dir = os.path.join(self.dir, 'catalog')
+        os.makedirs(os.path.join(catalog_dir, 'phrases', 'en'))
+        with open(os.path.join(catalog_dir, 'categories.json'), 'w', encoding='utf-8') as f:
+            json.dump({'needs': {'en': 'Needs'}}, f)
+        with open(os.path.join(catalog_dir, 'phrases', 'en', 'needs.txt'), 'w', encoding='utf-8') as f:
+            f.write(f'{self.phrase}\nRing the\x07bell\n')
+        catalog = generate_plist.Catalog(catalog_dir)
+        with self.assertRaisesRegex(ValueError, r'phrases/en/needs\.txt line 2: control character U\+0007'):
+            list(catalog.iter_phrases('en', 'needs'))
+
+class CatalogTests(unittest.TestCase):
+    def test_missing_catalog_is_a_value_error(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with self.assertRaisesRegex(ValueError, 'No categories.json'):
+                generate_plist.Catalog(os.path.join(tmp, 'missing'))
+
+    def test_unknown_selection_is_a_value_error(self):
+        with self.assertRaisesRegex(ValueError, 'Unknown language codes: xx'):
+            generate_plist.Catalog(generate_plist.default_catalog_dir, lang_codes=['en', 'xx'])
+        with self.assertRaisesRegex(ValueError, 'Unknown categories: nope'):
+            generate_plist.Catalog(generate_plist.default_catalog_dir, category_ids=['nope'])
+
+    def test_generates_only_selected_languages_and_categories(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            with contextlib.redirect_stdout(io.StringIO()):
+                generate_plist.generate_plist(output_dir=output_dir, lang_codes=['fr', 'en'],
+                                              category_ids=['needs', 'greetings'], sharded=True)
+            with open(os.path.join(output_dir, 'SoundboardCategories.plist'), 'rb') as f:
+                categories = plistlib.load(f)
+            # Catalog order is kept, whatever order the selection was given in
+            self.assertEqual([category['id'] for category in categories], ['greetings', 'needs'])
+            for category in categories:
+                self.assertEqual(list(category['displayNames']), ['en', 'fr'])
+                self.assertEqual(list(category['phrases']), ['en', 'fr'])
+            with open(os.path.join(output_dir, 'CallRequestOptions.plist'), 'rb') as f:
+                for option in plistlib.load(f):
+                    self.assertEqual(list(option['labels']), ['en', 'fr'])
+            with open(os.path.join(output_dir, generate_plist.shard_index_name), 'rb') as f:
+                index = plistlib.load(f)
+            self.assertEqual(index['languages'], ['en', 'fr'])
+            self.assertEqual(index['categories'], ['greetings', 'needs'])
+            self.assertEqual(sorted(name for name in os.listdir(output_dir) if name.endswith('.lproj')),
+                             ['en.lproj', 'fr.lproj'])
+
+class CompactResourcesTests(unittest.TestCase):
+    def setUp(self):
+        self.catalog = generate_plist.Catalog(generate_plist.default_catalog_dir)
+
+    def test_round_trips_catalog_categories(self):
+        for lang_code in ('en', 'fr', 'ja'):
+            categories = list(self.catalog.iter_categories([lang_code]))
+            compact = generate_plist.compact_resources(categories, lang_code, self.catalog.call_request_options)
+            strings = compact['strings']
+            self.assertEqual([entry['id'] for entry in compact['categories']], self.catalog.category_ids)
+            for category, entry in zip(categories, compact['categories']):
+                self.assertEqual(strings[entry['displayName']], category['displayNames'][lang_code])
+                self.assertEqual([strings[i] for i in entry['phrases']], category['phrases'][lang_code])
+                self.assertTrue(entry['phrases'])
+
+    def test_round_trips_call_request_labels(self):
+        options = self.catalog.call_request_options
+        compact = generate_plist.compact_resources([], 'en', options)
+        self.assertEqual([entry['type'] for entry in compact['callRequestOptions']],
+                         [option['type'] for option in options])
+        for option, entry in zip(options, compact['callRequestOptions']):
+            self.assertEqual(compact['strings'][entry['label']], option['labels']['en'])
+
+    def test_stores_repeated_strings_once(self):
+        categories = [
+            {'id': 'a', 'displayNames': {'en': 'A'}, 'phrases': {'en': ['Yes', 'No']}},
+            {'id': 'b', 'displayNames': {}, 'phrases': {'en': ['No', 'Yes']}},
+        ]
+        compact = generate_plist.compact_resources(categories, 'en', [])
+        self.assertEqual(compact['strings'], ['A', 'Yes', 'No'])
+        self.assertEqual(compact['categories'], [
+            {'id': 'a', 'displayName': 0, 'phrases': [1, 2]},
+            {'id': 'b', 'phrases': [2, 1]},
+        ])
+
+class SearchIndexTests(unittest.TestCase):
+    def index(self, lang_code, *phrases):
+        categories = [{'id': 'test', 'displayNames': {}, 'phrases': {lang_code: list(phrases)}}]
+        return generate_plist.search_index(categories, lang_code)
+
+    def test_folds_case_and_latin_accents(self):
+        index = self.index('fr', 'La douleur est aiguë', "J'ai des vertiges", 'Élève')
+        self.assertEqual(generate_plist.search(index, 'AIGUE'), [('test', 0)])
+        self.assertEqual(generate_plist.search(index, 'eleve'), [('test', 2)])
+        self.assertEqual(generate_plist.search(index, "j'ai des"), [('test', 1)])
+
+    def test_keeps_marks_outside_latin_greek_and_cyrillic(self):
+        self.assertEqual(generate_plist.normalize_search_text('नमस्ते'), 'नमस्ते')
+        self.assertEqual(generate_plist.normalize_search_text('Ἀθῆναι'), 'αθηναι')
+
+    def test_matches_katakana_against_hiragana(self):
+        index = self.index('ja', 'コーヒーをください', 'こんにちは')
+        self.assertEqual(generate_plist.search(index, 'こーひー'), [('test', 0)])
+        self.assertEqual(generate_plist.search(index, 'コンニチハ'), [('test', 1)])
+
+    def test_matches_thai_substring(self):
+        index = self.index('th', 'ฉันต้องการน้ำ', 'ฉันต้องการอาหาร', 'ฉันต้องไปห้องน้ำ')
+        self.assertEqual(generate_plist.search(index, 'อาหาร'), [('test', 1)])
+        self.assertEqual(generate_plist.search(index, 'น้ำ'), [('test', 0), ('test', 2)])
+
+    def test_short_query_uses_prefixes(self):
+        index = self.index('en', 'I need water', 'Call the nurse', 'Turn off the TV')
+        self.assertEqual(index['gramSize'], 3)
+        self.assertEqual(generate_plist.search(index, 'n'), [('test', 0), ('test', 1)])
+        self.assertEqual(generate_plist.search(index, 'Th'), [('test', 1), ('test', 2)])
+        # Prefixes only start at word boundaries in segmented languages
+        self.assertEqual(generate_plist.search(index, 'ur'), [])
+        self.assertEqual(generate_plist.search(index, ''), [])
+
+    def test_unsegmented_prefixes_start_anywhere(self):
+        index = self.index('zh', '我需要水', '我想喝水')
+        self.assertEqual(index['gramSize'], 2)
+        self.assertEqual(generate_plist.search(index, '水'), [('test', 0), ('test', 1)])
+        self.assertEqual(generate_plist.search(index, '需要'), [('test', 0)])
+
+class BuildCacheTests(unittest.TestCase):
+    def generate(self, output_dir, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_plist.generate_plist(output_dir=output_dir, **kwargs)
+
+    @staticmethod
+    def read_outputs(output_dir):
+        outputs = {}
+        for directory, _, filenames in os.walk(output_dir):
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                with open(path, 'rb') as f:
+                    outputs[os.path.relpath(path, output_dir)] = f.read()
+        return outputs
+
+    def test_jobs_output_matches_serial_run(self):
+        options = dict(sharded=True, compact=True, with_search_index=True,
+                       formats=generate_plist.parse_formats(['binary', 'SoundboardCategories=xml', 'SearchIndex=xml']))
+        with tempfile.TemporaryDirectory() as serial_dir, tempfile.TemporaryDirectory() as parallel_dir:
+            self.generate(serial_dir, jobs=1, **options)
+            self.generate(parallel_dir, jobs=2, **options)
+            serial = self.read_outputs(serial_dir)
+            self.assertIn('CompactResources.en.plist', serial)
+            self.assertEqual(self.read_outputs(parallel_dir), serial)
+
+    def test_rewrites_only_stale_outputs(self):
+        options = dict(sharded=True, compact=True, with_search_index=True)
+        with tempfile.TemporaryDirectory() as tmp:
+            catalog_dir = os.path.join(tmp, 'catalog')
+            output_dir = os.path.join(tmp, 'out')
+            shutil.copytree(generate_plist.default_catalog_dir, catalog_dir)
+            phrases_path = os.path.join(catalog_dir, 'phrases', 'de', 'needs.txt')
+
+            def run():
+                # Age every output so a rewrite always shows up as a new mtime
+                for name in self.read_outputs(output_dir):
+                    os.utime(os.path.join(output_dir, name), ns=(10**9, 10**9))
+                out = io.StringIO()
+                with contextlib.redirect_stdout(out):
+                    generate_plist.generate_plist(catalog_dir=catalog_dir, output_dir=output_dir, **options)
+                rewritten = {name for name in self.read_outputs(output_dir)
+                             if os.stat(os.path.join(output_dir, name)).st_mtime_ns != 10**9}
+                return out.getvalue(), rewritten - {generate_plist.manifest_name}
+
+            out, rewritten = run()
+            total = len(rewritten)
+            self.assertIn(f'{total} written, 0 unchanged', out)
+
+            out, rewritten = run()
+            self.assertIn('Resources are up to date', out)
+            self.assertEqual(rewritten, set())
+
+            # A new mtime with the same content misses the fast path but rewrites nothing
+            os.utime(phrases_path)
+            out, rewritten = run()
+            self.assertIn(f'0 written, {total} unchanged', out)
+            self.assertEqual(rewritten, set())
+
+            with open(phrases_path, 'a', encoding='utf-8') as f:
+                f.write('Ich brauche eine Decke\n')
+            out, rewritten = run()
+            self.assertIn(f'4 written, {total - 4} unchanged', out)
+            self.assertEqual(rewritten, {
+                'SoundboardCategories.plist', 'SoundboardCategories.de.plist',
+                'CompactResources.de.plist', 'SearchIndex.de.plist',
+            })
+
+    def test_dropped_language_whose_directory_was_deleted(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            self.generate(output_dir)
+            shutil.rmtree(os.path.join(output_dir, 'fr.lproj'))
+            self.generate(output_dir, lang_codes=['en'])
+            self.generate(output_dir, lang_codes=['en'], force=True)
+            self.assertEqual(sorted(os.listdir(output_dir)), [
+                generate_plist.manifest_name, 'CallRequestOptions.plist', 'SoundboardCategories.plist', 'en.lproj',
+            ])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import contextlib
+import io
+import os
+import plistlib
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import import_plist
+
+class ImportSoundboardTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+        self.catalog_dir = os.path.join(self.dir, 'catalog')
+        os.makedirs(os.path.join(self.catalog_dir, 'phrases', 'en'))
+        self.plist = os.path.join(self.dir, 'SoundboardCategories.plist')
+        with open(self.plist, 'wb') as f:
+            plistlib.dump([
+                {'id': 'greetings', 'displayNames': {'en': 'Greetings'},
+                 'phrases': {'en': ['Hello', 'Goodbye', 'Thank you'], 'it': ['Ciao']}},
+            ], f)
+
+    def write_phrases(self, content):
+        with open(os.path.join(self.catalog_dir, 'phrases', 'en', 'greetings.txt'), 'w', newline='') as f:
+            f.write(content)
+
+    def import_soundboard(self, *paths, merge='fill'):
+        importer = import_plist.CatalogImporter(self.catalog_dir, merge=merge)
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            for path in paths:
+                importer.import_soundboard(path)
+            importer.save()
+        return importer, out.getvalue()
+
+    def read_phrases(self, lang_code):
+        with open(os.path.join(self.catalog_dir, 'phrases', lang_code, 'greetings.txt'), newline='') as f:
+            return f.read()
+
+    def test_fill_keeps_existing_phrases(self):
+        self.write_phrases('Hi\n')
+        self.import_soundboard(self.plist)
+        self.assertEqual(self.read_phrases('en'), 'Hi\n')
+        self.assertEqual(self.read_phrases('it'), 'Ciao\n')
+
+    def test_union_appends_after_missing_final_newline(self):
+        self.write_phrases('Hello\nHi')
+        self.import_soundboard(self.plist, merge='union')
+        self.assertEqual(self.read_phrases('en'), 'Hello\nHi\nGoodbye\nThank you\n')
+
+    def test_union_matches_crlf_lines(self):
+        self.write_phrases('Hello\r\nGoodbye\r\n')
+        self.import_soundboard(self.plist, merge='union')
+        self.assertEqual(self.read_phrases('en'), 'Hello\r\nGoodbye\r\nThank you\n')
+
+    def test_union_in_batches(self):
+        self.write_phrases('Goodbye\n')
+        batch_size = import_plist.union_batch_size
+        import_plist.union_batch_size = 1
+        try:
+            self.import_soundboard(self.plist, self.plist, merge='union')
+        finally:
+            import_plist.union_batch_size = batch_size
+        self.assertEqual(self.read_phrases('en'), 'Goodbye\nHello\nThank you\n')
+
+    def test_reimported_category_counts_once(self):
+        importer, out = self.import_soundboard(self.plist, self.plist)
+        self.assertEqual(list(importer.imported_categories), ['greetings'])
+        self.assertNotIn('Phrases missing for some categories', out)
+
+    def test_rejects_ids_that_are_not_file_names(self):
+        bad_ids = ['../../escaped', 'a/b', '.', '..', '.hidden']
+        with open(self.plist, 'wb') as f:
+            plistlib.dump([{'id': category_id, 'phrases': {'en': ['Hello']}} for category_id in bad_ids], f)
+        importer, out = self.import_soundboard(self.plist)
+        self.assertEqual(importer.imported_categories, {})
+        self.assertEqual(out.count('has an invalid id'), len(bad_ids))
+        self.assertEqual(os.listdir(os.path.join(self.catalog_dir, 'phrases', 'en')), [])
+        self.assertEqual(os.listdir(self.catalog_dir), ['phrases'])
+        self.assertEqual(sorted(os.listdir(self.dir)), ['SoundboardCategories.plist', 'catalog'])
+
+if __name__ == '__main__':
+    unittest.main()